@@ -2,21 +2,11 @@
 AI Parser module for processing game descriptions
 """
 import json
-from openai import OpenAI
 import sys
 import os
 
 # Add the project root to the path so we can import config
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
-from config.settings import OPENAI_API_KEY
-
-# New way
-client = OpenAI()
-response = client.chat.completions.create(
-    model="gpt-3.5-turbo",
-    messages=[{"role": "user", "content": "Your game description"}]
-)
-completion = response.choices[0].message.content
 
 class GameDescriptionParser:
     """
@@ -24,10 +14,23 @@ class GameDescriptionParser:
     using a language model.
     """
     
-    def __init__(self):
-        """Initialize the parser"""
-        if not OPENAI_API_KEY:
-            raise ValueError("OpenAI API key is not set. Please check your .env file.")
+    def __init__(self, client=None):
+        """
+        Initialize the parser
+        
+        Args:
+            client: OpenAI-compatible client to use. When omitted, a default
+                OpenAI client is created from the configured API key.
+        """
+        if client is None:
+            # Imported here: the OpenAI client and the .env lookup are only
+            # needed once a real parser is created
+            from config.settings import OPENAI_API_KEY
+            if not OPENAI_API_KEY:
+                raise ValueError("OpenAI API key is not set. Please check your .env file.")
+            from openai import OpenAI
+            client = OpenAI(api_key=OPENAI_API_KEY)
+        self.client = client
     
     def parse_description(self, description):
         """
@@ -58,7 +61,7 @@ class GameDescriptionParser:
         
         try:
             # Call the OpenAI API
-            response = client.chat.completions.create(
+            response = self.client.chat.completions.create(
                 model="gpt-3.5-turbo",  # You can use a different model
                 messages=[
                     {"role": "system", "content": "You are a game design assistant that outputs only valid JSON."},
@@ -101,18 +104,30 @@ class GameDescriptionParser:
         Returns:
             str: Name of the template to use
         """
-        # Simple logic to determine template based on game type
-        game_type = game_params.get("game_type", "").lower()
+        return select_template(game_params)
+
+def select_template(game_params):
+    """
+    Determine the appropriate game template based on parsed parameters
+    
+    Args:
+        game_params (dict): Structured game parameters
         
-        if "platformer" in game_type:
-            return "platformer"
-        elif "puzzle" in game_type:
-            return "puzzle"
-        elif "arcade" in game_type or "shooter" in game_type:
-            return "arcade"
-        else:
-            # Default template
-            return "platformer"
+    Returns:
+        str: Name of the template to use
+    """
+    # Simple logic to determine template based on game type
+    game_type = str(game_params.get("game_type", "")).lower()
+    
+    if "platformer" in game_type:
+        return "platformer"
+    elif "puzzle" in game_type:
+        return "puzzle"
+    elif "arcade" in game_type or "shooter" in game_type:
+        return "arcade"
+    else:
+        # Default template
+        return "platformer"
 
 # Simple test function
 def test_parser():
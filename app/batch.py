@@ -0,0 +1,340 @@
+"""
+Batch game generation
+
+Streams game descriptions or parameter dicts from a JSON-lines file (or
+stdin), parses them with bounded concurrency, builds and validates the
+levels headlessly across a process pool and streams one JSON result line
+per input, in input order.
+
+Each input line is one of:
+    "A platformer in a cave"                       a description
+    {"description": "...", "id": ..., "seed": ...} a description with options
+    {"params": {...}, "template": "platformer"}    ready-made parameters
+    {"game_type": "platformer", ...}               a bare parameter dict
+"""
+import os
+import sys
+import json
+import math
+import time
+import random
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+# Add the project root to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config.settings import DEFAULT_GAME_WIDTH, DEFAULT_GAME_HEIGHT
+
+# Simulation ticks used to sanity-check each level
+DEFAULT_VALIDATION_TICKS = 300
+
+def read_jsonl(stream):
+    """
+    Lazily read JSON values from a JSON-lines stream
+
+    Args:
+        stream: Text stream to read from
+
+    Yields:
+        Decoded JSON value, or a dict with an "error" key for bad lines
+    """
+    for line_number, line in enumerate(stream, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError as e:
+            yield {"error": f"line {line_number}: invalid JSON: {e}"}
+
+def normalize_item(item, index):
+    """
+    Turn one decoded input line into a batch job
+
+    Args:
+        item: Decoded JSON value from the input
+        index (int): Position of the item in the input
+
+    Returns:
+        dict: Job with id, seed, description, params, template and error keys
+    """
+    job = {"index": index, "id": None, "seed": index, "description": None,
+           "params": None, "template": None, "error": None}
+
+    if isinstance(item, str):
+        job["description"] = item
+    elif isinstance(item, dict):
+        job["id"] = item.get("id")
+        job["seed"] = item.get("seed", index)
+        job["template"] = item.get("template")
+        if "error" in item and len(item) == 1:
+            job["error"] = item["error"]
+        elif "description" in item:
+            job["description"] = item["description"]
+        elif isinstance(item.get("params"), dict):
+            job["params"] = item["params"]
+        else:
+            job["params"] = {k: v for k, v in item.items()
+                             if k not in ("id", "seed", "template")}
+    else:
+        job["error"] = f"unsupported input: {type(item).__name__}"
+
+    return job
+
+def _init_worker():
+    """Prepare a pool process for headless game building"""
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+def validate_level(game_objects, ticks, timestep=1):
+    """
+    Sanity-check a generated level and simulate it headlessly
+
+    Args:
+        game_objects (list): Objects created by a template
+        ticks (int): Number of frames to simulate
+        timestep (int): Frames advanced per update; collisions are swept,
+            so larger steps simulate the same time in fewer updates
+
+    Returns:
+        dict: Named checks, an overall "valid" flag and the "error" that
+            stopped the simulation, if any
+    """
+    from app.game_engine.engine import Player, collect_managed, update_game_objects
+    from app.game_engine.animation import Animator
+
+    def in_bounds(obj):
+        return (0 <= obj.x and 0 <= obj.y and
+                obj.x + obj.width <= DEFAULT_GAME_WIDTH and
+                obj.y + obj.height <= DEFAULT_GAME_HEIGHT)
+
+    placed = [obj for obj in game_objects if hasattr(obj, 'rect')]
+    players = [obj for obj in placed if isinstance(obj, Player)]
+    # Enemies are whatever the game managers treat as enemies
+    enemies = [enemy for obj in game_objects for enemy in getattr(obj, 'enemies', ())]
+
+    checks = {
+        "has_objects": bool(placed),
+        "has_player": len(players) == 1,
+        "objects_in_bounds": all(in_bounds(obj) for obj in placed),
+        "player_spawn_clear": all(
+            not player.rect.colliderect(enemy.rect)
+            for player in players for enemy in enemies if enemy is not player
+        )
+    }
+
+    error = None
+    try:
+        # Animate and update the objects as GameEngine.step() does
+        animator = Animator()
+        for obj in game_objects:
+            if hasattr(obj, 'bind_animation'):
+                obj.bind_animation(animator)
+        managed = collect_managed(game_objects)
+        for step in range(math.ceil(ticks / timestep)):
+            # Animations are sampled at whole ticks
+            animator.update(int(step * timestep))
+            update_game_objects(game_objects, timestep, managed)
+        checks["simulation_ran"] = True
+    except Exception as e:
+        checks["simulation_ran"] = False
+        error = f"{type(e).__name__}: {e}"
+
+    checks["positions_finite"] = all(
+        math.isfinite(obj.x) and math.isfinite(obj.y) for obj in placed
+    )
+    checks["player_in_bounds"] = all(in_bounds(player) for player in players)
+
+    return {"valid": all(checks.values()), "checks": checks, "error": error}
+
+def build_and_validate(template_name, game_params, seed, ticks, snapshot_path=None, timestep=1):
+    """
+    Build a game from a template and validate the resulting level
+
+    Runs inside a pool process, so it only takes and returns plain data.
+
+    Args:
+        template_name (str): Name of the template to use
+        game_params (dict): Game parameters
+        seed: Seed for the template's random level generation
+        ticks (int): Number of frames simulated for validation
+        snapshot_path (str): Where to save the freshly built level, if given
+        timestep (int): Frames advanced per validation update
+
+    Returns:
+        dict: Level artifact, validation report and timings
+    """
+    from importlib import import_module
+    from app.game_engine.engine import serialize_game_objects
+    from app.game_engine.snapshot import write_snapshot
+    from config.settings import ASSETS_DIR
+
+    start = time.perf_counter()
+    random.seed(seed)
+    template = import_module(f"app.game_engine.templates.{template_name}")
+    game_objects = template.create_game_objects(game_params, ASSETS_DIR)
+    level = serialize_game_objects(game_objects)
+    if snapshot_path:
+        write_snapshot(snapshot_path, game_objects, template_name, game_params)
+    built = time.perf_counter()
+
+    validation = validate_level(game_objects, ticks, timestep)
+    validated = time.perf_counter()
+
+    return {
+        "level": level,
+        "validation": validation,
+        "timings": {
+            "build_ms": (built - start) * 1000,
+            "validate_ms": (validated - built) * 1000
+        }
+    }
+
+class BatchRunner:
+    """
+    Runs batch jobs through the parse and build/validate stages
+
+    Jobs are processed by a bounded window of threads: each thread parses its
+    job (at most parse_concurrency LLM calls at a time) and hands the build to
+    the process pool. Results are yielded in input order, and no more than
+    the window size of jobs is held in memory at any time.
+    """
+
+    def __init__(self, workers=None, parse_concurrency=8, ticks=DEFAULT_VALIDATION_TICKS,
+                 parser=None, snapshot_dir=None, timestep=1):
+        """
+        Initialize the batch runner
+
+        Args:
+            workers (int): Number of build processes, defaults to the CPU count
+            parse_concurrency (int): Maximum number of concurrent LLM calls
+            ticks (int): Simulation ticks used for validation
+            parser: GameDescriptionParser to use, created on first use if omitted
+            snapshot_dir (str): Directory to save a binary snapshot of each level in
+            timestep (int): Frames advanced per validation update
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.parse_concurrency = max(1, parse_concurrency)
+        self.ticks = ticks
+        self.window = self.parse_concurrency + self.workers * 2
+        self.snapshot_dir = snapshot_dir
+        self.timestep = timestep
+        self._parser = parser
+        self._parser_lock = threading.Lock()
+        self._parse_slots = threading.BoundedSemaphore(self.parse_concurrency)
+
+    def _get_parser(self):
+        """Create the description parser on first use"""
+        with self._parser_lock:
+            if self._parser is None:
+                from app.ai_parser.parser import GameDescriptionParser
+                self._parser = GameDescriptionParser()
+            return self._parser
+
+    def _process(self, job, pool):
+        """Parse a job if needed, then build and validate it in the pool"""
+        from app.ai_parser.parser import select_template
+
+        result = {"index": job["index"], "id": job["id"], "params": job["params"],
+                  "template": job["template"], "level": None, "snapshot": None, "validation": None,
+                  "timings": {}, "error": job["error"]}
+        if result["error"]:
+            return result
+
+        start = time.perf_counter()
+        try:
+            if job["description"] is not None:
+                parser = self._get_parser()
+                with self._parse_slots:
+                    result["params"] = parser.parse_description(job["description"])
+                result["timings"]["parse_ms"] = (time.perf_counter() - start) * 1000
+
+            if not result["template"]:
+                result["template"] = select_template(result["params"])
+
+            if self.snapshot_dir:
+                result["snapshot"] = os.path.join(self.snapshot_dir, f"{job['index']:08d}.agcs")
+
+            built = pool.submit(build_and_validate, result["template"], result["params"],
+                                job["seed"], self.ticks, result["snapshot"],
+                                self.timestep).result()
+            result["level"] = built["level"]
+            result["validation"] = built["validation"]
+            result["timings"].update(built["timings"])
+            if built["validation"]["error"]:
+                # A crash is a bug in the template or engine, not a bad level
+                result["error"] = f"simulation failed: {built['validation']['error']}"
+        except Exception as e:
+            result["error"] = f"{type(e).__name__}: {e}"
+
+        result["timings"]["total_ms"] = (time.perf_counter() - start) * 1000
+        return result
+
+    def run(self, items):
+        """
+        Process a stream of input items
+
+        Args:
+            items (iterable): Decoded JSON input values
+
+        Yields:
+            dict: One result per input item, in input order
+        """
+        pending = deque()
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker) as pool, \
+                ThreadPoolExecutor(max_workers=self.window) as threads:
+            for index, item in enumerate(items):
+                if len(pending) >= self.window:
+                    yield pending.popleft().result()
+                job = normalize_item(item, index)
+                pending.append(threads.submit(self._process, job, pool))
+
+            while pending:
+                yield pending.popleft().result()
+
+def run_batch(input_path, output_path=None, workers=None, parse_concurrency=8,
+              ticks=DEFAULT_VALIDATION_TICKS, snapshot_dir=None, timestep=1):
+    """
+    Run a batch of games from a JSON-lines file and stream JSON-lines results
+
+    Args:
+        input_path (str): JSON-lines input file, "-" for stdin
+        output_path (str): JSON-lines output file, stdout if omitted
+        workers (int): Number of build processes
+        parse_concurrency (int): Maximum number of concurrent LLM calls
+        ticks (int): Simulation ticks used for validation
+        snapshot_dir (str): Directory to save a binary snapshot of each level in
+        timestep (int): Frames advanced per validation update
+
+    Returns:
+        dict: Summary counts of processed, valid and failed games
+    """
+    if snapshot_dir:
+        os.makedirs(snapshot_dir, exist_ok=True)
+    runner = BatchRunner(workers=workers, parse_concurrency=parse_concurrency, ticks=ticks,
+                         snapshot_dir=snapshot_dir, timestep=timestep)
+    summary = {"processed": 0, "valid": 0, "invalid": 0, "errors": 0}
+
+    source = sys.stdin if input_path == "-" else open(input_path, "r")
+    sink = sys.stdout if not output_path or output_path == "-" else open(output_path, "w")
+    try:
+        for result in runner.run(read_jsonl(source)):
+            sink.write(json.dumps(result) + "\n")
+            sink.flush()
+            summary["processed"] += 1
+            if result["error"]:
+                summary["errors"] += 1
+            elif result["validation"]["valid"]:
+                summary["valid"] += 1
+            else:
+                summary["invalid"] += 1
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if sink is not sys.stdout:
+            sink.close()
+
+    print(f"Batch finished: {json.dumps(summary)}", file=sys.stderr)
+    return summary
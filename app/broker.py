@@ -0,0 +1,705 @@
+"""
+Distributing games to worker nodes
+
+The web server does not run games itself: it submits each game (template
+and parameters) as a job to a broker, and worker nodes (python app/main.py
+--worker) pull jobs, run them and report the results. Workers send a
+heartbeat with their load every few seconds. Each job is routed to the
+least-loaded live node, and the jobs queued on a node that stops sending
+heartbeats are handed to the other nodes.
+
+Brokers, chosen by URL (see connect_broker()):
+    memory://             InProcessBroker, queues inside the web server
+                          process, which then runs the games itself with a
+                          local worker thread (the default)
+    redis://host:6379/0   RedisBroker, shared by any number of front ends
+                          and worker nodes; uses redis-py when it is
+                          installed and RedisConnection otherwise
+    local://              RedisBroker over LocalRedis, an in-process
+                          stand-in for a Redis server, e.g. for tests
+
+Job statuses go from "queued" to "running" to "finished" or "failed".
+"""
+import os
+import sys
+import json
+import math
+import time
+import uuid
+import socket
+import tempfile
+import threading
+import subprocess
+from abc import ABC, abstractmethod
+from collections import deque
+from urllib.parse import urlparse
+
+# Add the project root to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config.settings import (WORKER_CAPACITY, WORKER_HEARTBEAT_INTERVAL, WORKER_TIMEOUT,
+                             JOB_RESULT_TTL)
+
+# Script that runs a single game
+GAME_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py")
+
+def default_node_id():
+    """Identify this process as a worker node"""
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+class JobBroker(ABC):
+    """
+    Interface shared by the brokers
+
+    Front ends call submit() and status(); worker nodes call heartbeat(),
+    fetch(), report() and leave().
+    """
+
+    def __init__(self, node_timeout=WORKER_TIMEOUT, result_ttl=JOB_RESULT_TTL):
+        """
+        Initialize the broker
+
+        Args:
+            node_timeout (float): Seconds without a heartbeat after which a
+                node is considered gone
+            result_ttl (float): Seconds a job's status is kept
+        """
+        self.node_timeout = node_timeout
+        self.result_ttl = result_ttl
+
+    @staticmethod
+    def new_job(template_name, game_params):
+        """Create the record of a newly submitted job"""
+        return {"id": uuid.uuid4().hex, "template": template_name, "params": game_params,
+                "node": None, "status": "queued", "submitted": time.time()}
+
+    @staticmethod
+    def pick_node(nodes, queued, running):
+        """
+        Choose the least-loaded node
+
+        Args:
+            nodes (list): Live node infos, as sent with their heartbeats
+            queued (dict): Number of jobs waiting per node id
+            running (dict): Number of jobs running per node id, as counted by
+                the broker; the heartbeats' figures can be a few seconds old
+
+        Returns:
+            str: Node id, or None if there are no nodes
+        """
+        best = None
+        for node in nodes:
+            node_id = node["node"]
+            busy = running.get(node_id, node["running"]) + queued.get(node_id, 0)
+            score = (busy / max(1, node["capacity"]), node_id)
+            if best is None or score < best:
+                best = score
+        return best[1] if best else None
+
+    @abstractmethod
+    def submit(self, template_name, game_params):
+        """
+        Queue a game on the least-loaded node
+
+        Returns:
+            dict: Job record with "id", "node" and "status"
+        """
+
+    @abstractmethod
+    def status(self, job_id):
+        """Return a job's record, or None if it is unknown or has expired"""
+
+    @abstractmethod
+    def nodes(self):
+        """Return the infos of the live nodes, dropping the ones that went silent"""
+
+    @abstractmethod
+    def heartbeat(self, node_id, capacity, running, load=None):
+        """
+        Register a node or refresh its liveness and load
+
+        Args:
+            node_id (str): Node identifier
+            capacity (int): Games the node runs at once
+            running (int): Games the node is running
+            load (float): System load of the node's host, if known
+        """
+
+    @abstractmethod
+    def fetch(self, node_id, timeout=1.0):
+        """
+        Take the next job for a node, waiting up to timeout seconds
+
+        Jobs routed to the node come first, then jobs queued while no node
+        was available. The job is marked as running on the node.
+
+        Returns:
+            dict: Job record, or None if no job arrived in time
+        """
+
+    @abstractmethod
+    def report(self, job_id, status, **details):
+        """
+        Update a job's status
+
+        Args:
+            job_id (str): Job identifier
+            status (str): New status, "finished" or "failed"
+            **details: Extra result fields, e.g. returncode or error
+        """
+
+    @abstractmethod
+    def leave(self, node_id):
+        """
+        Unregister a node and hand its queued jobs to the others
+
+        Jobs the node is still running keep their status until it reports them.
+        """
+
+class InProcessBroker(JobBroker):
+    """Broker whose queues live in this process"""
+
+    def __init__(self, **options):
+        super().__init__(**options)
+        self._changed = threading.Condition()
+        self._nodes = {}
+        self._queues = {}
+        self._shared = deque()
+        self._running = {}
+        self._jobs = {}
+
+    def _forget_expired(self):
+        cutoff = time.time() - self.result_ttl
+        expired = [job_id for job_id, job in self._jobs.items()
+                   if job["status"] in ("finished", "failed") and job.get("ended", 0) < cutoff]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def _live_nodes(self):
+        cutoff = time.time() - self.node_timeout
+        for node_id in [n for n, info in self._nodes.items() if info["heartbeat"] < cutoff]:
+            self._drop_node(node_id, lost=True)
+        return list(self._nodes.values())
+
+    def _drop_node(self, node_id, lost):
+        del self._nodes[node_id]
+        for job_id in self._queues.pop(node_id, ()):
+            self._jobs[job_id]["node"] = None
+            self._shared.append(job_id)
+        running = self._running.pop(node_id, ())
+        if lost:
+            for job_id in running:
+                self._jobs[job_id].update(status="failed", error="node stopped sending heartbeats",
+                                          ended=time.time())
+        self._changed.notify_all()
+
+    def submit(self, template_name, game_params):
+        job = self.new_job(template_name, game_params)
+        with self._changed:
+            self._forget_expired()
+            nodes = self._live_nodes()
+            queued = {node_id: len(queue) for node_id, queue in self._queues.items()}
+            running = {node["node"]: len(self._running.get(node["node"], ())) for node in nodes}
+            node_id = self.pick_node(nodes, queued, running)
+            job["node"] = node_id
+            self._jobs[job["id"]] = job
+            (self._queues[node_id] if node_id else self._shared).append(job["id"])
+            self._changed.notify_all()
+        return dict(job)
+
+    def status(self, job_id):
+        with self._changed:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def nodes(self):
+        with self._changed:
+            return [dict(info) for info in self._live_nodes()]
+
+    def heartbeat(self, node_id, capacity, running, load=None):
+        with self._changed:
+            self._nodes[node_id] = {"node": node_id, "capacity": capacity, "running": running,
+                                    "load": load, "heartbeat": time.time()}
+            self._queues.setdefault(node_id, deque())
+            self._live_nodes()
+
+    def fetch(self, node_id, timeout=1.0):
+        deadline = time.monotonic() + timeout
+        with self._changed:
+            while True:
+                queue = self._queues.get(node_id)
+                if queue or self._shared:
+                    job = self._jobs[(queue or self._shared).popleft()]
+                    job.update(node=node_id, status="running", started=time.time())
+                    self._running.setdefault(node_id, set()).add(job["id"])
+                    return dict(job)
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                self._changed.wait(remaining)
+
+    def report(self, job_id, status, **details):
+        with self._changed:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                job.update(details, status=status, ended=time.time())
+                self._running.get(job["node"], set()).discard(job_id)
+
+    def leave(self, node_id):
+        with self._changed:
+            if node_id in self._nodes:
+                self._drop_node(node_id, lost=False)
+
+def _text(value):
+    """Decode a Redis reply value"""
+    return value.decode("utf-8") if isinstance(value, bytes) else value
+
+class RedisBroker(JobBroker):
+    """
+    Broker kept in a Redis server
+
+    Works with any client that has execute_command(*args): redis-py's
+    Redis, RedisConnection or LocalRedis.
+
+    Keys:
+        agc:nodes            hash of node id to node info (JSON)
+        agc:queue:<node>     list of job ids routed to a node
+        agc:queue            list of job ids queued while no node was live
+        agc:running:<node>   set of job ids a node is running
+        agc:job:<id>         job record (JSON), expiring after result_ttl
+    """
+
+    def __init__(self, client, prefix="agc", **options):
+        """
+        Initialize the broker
+
+        Args:
+            client: Redis client
+            prefix (str): Prefix of the keys used
+            **options: See JobBroker
+        """
+        super().__init__(**options)
+        self.client = client
+        self.prefix = prefix
+        self._nodes_key = f"{prefix}:nodes"
+        self._shared_key = f"{prefix}:queue"
+
+    def _command(self, *args):
+        return self.client.execute_command(*args)
+
+    def _queue_key(self, node_id):
+        return f"{self.prefix}:queue:{node_id}"
+
+    def _running_key(self, node_id):
+        return f"{self.prefix}:running:{node_id}"
+
+    def _job_key(self, job_id):
+        return f"{self.prefix}:job:{job_id}"
+
+    def _save(self, job):
+        self._command("SET", self._job_key(job["id"]), json.dumps(job), "EX",
+                      max(1, int(self.result_ttl)))
+
+    def _live_nodes(self):
+        reply = self._command("HGETALL", self._nodes_key) or []
+        pairs = reply.items() if isinstance(reply, dict) else zip(reply[::2], reply[1::2])
+        cutoff = time.time() - self.node_timeout
+        nodes = []
+        for node_id, info in pairs:
+            info = json.loads(_text(info))
+            if info["heartbeat"] < cutoff:
+                self._drop_node(_text(node_id), lost=True)
+            else:
+                nodes.append(info)
+        return nodes
+
+    def _drop_node(self, node_id, lost):
+        # Only the caller that removes the node hands its jobs on
+        if not self._command("HDEL", self._nodes_key, node_id):
+            return
+        # Nothing pops the queue of a dropped node, so its jobs can be
+        # updated before they are moved to the shared queue
+        queue_key = self._queue_key(node_id)
+        for job_id in self._command("LRANGE", queue_key, 0, -1) or ():
+            job = self.status(_text(job_id))
+            if job is not None:
+                job["node"] = None
+                self._save(job)
+        while self._command("RPOPLPUSH", queue_key, self._shared_key) is not None:
+            pass
+        if lost:
+            for job_id in self._command("SMEMBERS", self._running_key(node_id)) or ():
+                self.report(_text(job_id), "failed", error="node stopped sending heartbeats")
+            self._command("DEL", self._running_key(node_id))
+
+    def submit(self, template_name, game_params):
+        job = self.new_job(template_name, game_params)
+        nodes = self._live_nodes()
+        queued = {node["node"]: self._command("LLEN", self._queue_key(node["node"]))
+                  for node in nodes}
+        running = {node["node"]: self._command("SCARD", self._running_key(node["node"]))
+                   for node in nodes}
+        job["node"] = self.pick_node(nodes, queued, running)
+        self._save(job)
+        self._command("LPUSH", self._queue_key(job["node"]) if job["node"] else self._shared_key,
+                      job["id"])
+        return job
+
+    def status(self, job_id):
+        data = self._command("GET", self._job_key(job_id))
+        return json.loads(_text(data)) if data is not None else None
+
+    def nodes(self):
+        return self._live_nodes()
+
+    def heartbeat(self, node_id, capacity, running, load=None):
+        info = {"node": node_id, "capacity": capacity, "running": running, "load": load,
+                "heartbeat": time.time()}
+        self._command("HSET", self._nodes_key, node_id, json.dumps(info))
+        self._live_nodes()
+
+    def fetch(self, node_id, timeout=1.0):
+        # BRPOP takes whole seconds on older servers, and 0 would block forever
+        reply = self._command("BRPOP", self._queue_key(node_id), self._shared_key,
+                              max(1, math.ceil(timeout)))
+        if not reply:
+            return None
+        job = self.status(_text(reply[1]))
+        if job is None:
+            return None
+        job.update(node=node_id, status="running", started=time.time())
+        self._save(job)
+        self._command("SADD", self._running_key(node_id), job["id"])
+        return job
+
+    def report(self, job_id, status, **details):
+        job = self.status(job_id)
+        if job is None:
+            return
+        job.update(details, status=status, ended=time.time())
+        self._save(job)
+        if job["node"]:
+            self._command("SREM", self._running_key(job["node"]), job_id)
+
+    def leave(self, node_id):
+        self._drop_node(node_id, lost=False)
+
+class RedisConnection:
+    """Minimal Redis client speaking the RESP protocol over a socket"""
+
+    def __init__(self, host="localhost", port=6379, db=0, password=None, timeout=None):
+        """
+        Connect to a Redis server
+
+        Args:
+            host (str): Server host
+            port (int): Server port
+            db (int): Database number
+            password (str): Password, if the server requires one
+            timeout (float): Socket timeout in seconds; must be longer than
+                any blocking command waits
+        """
+        self._address = (host, port)
+        self._db = db
+        self._password = password
+        self._timeout = timeout
+        self._lock = threading.Lock()
+        self._connect()
+
+    def _connect(self):
+        self._socket = socket.create_connection(self._address, timeout=self._timeout)
+        self._reader = self._socket.makefile("rb")
+        if self._password:
+            self._send("AUTH", self._password)
+        if self._db:
+            self._send("SELECT", self._db)
+
+    def _send(self, *args):
+        parts = [str(arg).encode("utf-8") if not isinstance(arg, bytes) else arg for arg in args]
+        self._socket.sendall(b"*%d\r\n" % len(parts) + b"".join(
+            b"$%d\r\n%s\r\n" % (len(part), part) for part in parts))
+        return self._read_reply()
+
+    def execute_command(self, *args):
+        """Send a command and return its reply"""
+        with self._lock:
+            if self._socket is None:
+                self._connect()
+            try:
+                return self._send(*args)
+            except RuntimeError:
+                raise
+            except BaseException:
+                # A command cut short (e.g. by Ctrl-C during BRPOP) leaves its
+                # reply unread, so start over on a fresh connection
+                self._close()
+                raise
+
+    def _read_reply(self):
+        line = self._reader.readline()
+        if not line:
+            raise ConnectionError("Connection to the Redis server was closed")
+        kind, rest = line[:1], line[1:-2]
+        if kind == b"+":
+            return rest.decode("utf-8")
+        if kind == b"-":
+            raise RuntimeError(f"Redis error: {rest.decode('utf-8')}")
+        if kind == b":":
+            return int(rest)
+        if kind == b"$":
+            length = int(rest)
+            return None if length < 0 else self._reader.read(length + 2)[:-2].decode("utf-8")
+        if kind == b"*":
+            length = int(rest)
+            return None if length < 0 else [self._read_reply() for _ in range(length)]
+        raise ConnectionError(f"Unexpected reply from the Redis server: {line!r}")
+
+    def _close(self):
+        if self._socket is not None:
+            self._reader.close()
+            self._socket.close()
+            self._socket = None
+
+    def close(self):
+        """Close the connection"""
+        with self._lock:
+            self._close()
+
+class LocalRedis:
+    """
+    In-process stand-in for the Redis commands RedisBroker uses
+
+    Replies have the same shapes as RedisConnection's, so a RedisBroker can
+    be exercised without a server.
+    """
+
+    def __init__(self):
+        self._changed = threading.Condition()
+        self._data = {}
+        self._expires = {}
+
+    def _get(self, key, default=None):
+        expires = self._expires.get(key)
+        if expires is not None and expires <= time.time():
+            self._data.pop(key, None)
+            del self._expires[key]
+        return self._data.get(key, default)
+
+    def _pop_right(self, key):
+        items = self._get(key)
+        if not items:
+            return None
+        value = items.pop()
+        if not items:
+            del self._data[key]
+        return value
+
+    def execute_command(self, command, *args):
+        """Run a command and return its reply"""
+        command = command.upper()
+        args = [_text(arg) if isinstance(arg, bytes) else str(arg) for arg in args]
+        with self._changed:
+            if command == "BRPOP":
+                *keys, timeout = args
+                deadline = time.monotonic() + float(timeout)
+                while True:
+                    for key in keys:
+                        value = self._pop_right(key)
+                        if value is not None:
+                            return [key, value]
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return None
+                    self._changed.wait(remaining)
+            return self._run(command, args)
+
+    def _run(self, command, args):
+        if command == "GET":
+            return self._get(args[0])
+        if command == "SET":
+            self._data[args[0]] = args[1]
+            self._expires.pop(args[0], None)
+            if len(args) >= 4 and args[2].upper() == "EX":
+                self._expires[args[0]] = time.time() + float(args[3])
+            return "OK"
+        if command == "DEL":
+            removed = 0
+            for key in args:
+                removed += self._data.pop(key, None) is not None
+                self._expires.pop(key, None)
+            return removed
+        if command == "HSET":
+            fields = self._data.setdefault(args[0], {})
+            added = 0
+            for field, value in zip(args[1::2], args[2::2]):
+                added += field not in fields
+                fields[field] = value
+            return added
+        if command == "HGETALL":
+            return [item for pair in self._get(args[0], {}).items() for item in pair]
+        if command == "HDEL":
+            fields = self._get(args[0], {})
+            return sum(fields.pop(field, None) is not None for field in args[1:])
+        if command == "LPUSH":
+            items = self._data.setdefault(args[0], [])
+            for value in args[1:]:
+                items.insert(0, value)
+            self._changed.notify_all()
+            return len(items)
+        if command == "LRANGE":
+            items = self._get(args[0], [])
+            stop = int(args[2])
+            return items[int(args[1]):None if stop == -1 else stop + 1]
+        if command == "LLEN":
+            return len(self._get(args[0], []))
+        if command == "RPOPLPUSH":
+            value = self._pop_right(args[0])
+            if value is not None:
+                self._data.setdefault(args[1], []).insert(0, value)
+                self._changed.notify_all()
+            return value
+        if command == "SADD":
+            members = self._data.setdefault(args[0], set())
+            before = len(members)
+            members.update(args[1:])
+            return len(members) - before
+        if command == "SREM":
+            members = self._get(args[0], set())
+            before = len(members)
+            members.difference_update(args[1:])
+            return before - len(members)
+        if command == "SMEMBERS":
+            return sorted(self._get(args[0], set()))
+        if command == "SCARD":
+            return len(self._get(args[0], set()))
+        raise RuntimeError(f"Redis error: unknown command '{command}'")
+
+def connect_broker(url):
+    """
+    Create the broker for a URL
+
+    Args:
+        url (str): memory://, local:// or redis://[:password@]host[:port][/db]
+
+    Returns:
+        JobBroker: The broker
+    """
+    parsed = urlparse(url)
+    if parsed.scheme == "memory":
+        return InProcessBroker()
+    if parsed.scheme == "local":
+        return RedisBroker(LocalRedis())
+    if parsed.scheme == "redis":
+        try:
+            import redis
+        except ImportError:
+            redis = None
+        if redis is not None:
+            return RedisBroker(redis.Redis.from_url(url))
+        db = int(parsed.path.strip("/") or 0)
+        return RedisBroker(RedisConnection(parsed.hostname or "localhost", parsed.port or 6379,
+                                           db=db, password=parsed.password))
+    raise ValueError(f"Unsupported broker URL: {url}")
+
+def run_game_process(job):
+    """
+    Run a job's game in a separate process until it exits
+
+    Args:
+        job (dict): Job record with "template" and "params"
+
+    Returns:
+        dict: Result details with the process's "returncode"
+    """
+    fd, params_file = tempfile.mkstemp(prefix=f"game-{job['id']}-", suffix=".json")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(job["params"], f)
+        completed = subprocess.run(
+            [sys.executable, GAME_SCRIPT, job["template"], params_file],
+            stdin=subprocess.DEVNULL,
+            creationflags=subprocess.CREATE_NEW_CONSOLE if os.name == 'nt' else 0
+        )
+        return {"returncode": completed.returncode}
+    finally:
+        os.remove(params_file)
+
+class Worker:
+    """Pulls jobs from a broker and runs them, reporting heartbeats and results"""
+
+    def __init__(self, broker, node_id=None, capacity=WORKER_CAPACITY, run_job=run_game_process,
+                 heartbeat_interval=WORKER_HEARTBEAT_INTERVAL):
+        """
+        Initialize the worker
+
+        Args:
+            broker (JobBroker): Broker to pull jobs from
+            node_id (str): Node identifier, derived from host and process if omitted
+            capacity (int): Games run at once
+            run_job (callable): Runs a job and returns a dict of result
+                details; a "returncode" other than 0 marks the job as failed
+            heartbeat_interval (float): Seconds between heartbeats
+        """
+        self.broker = broker
+        self.node_id = node_id or default_node_id()
+        self.capacity = max(1, capacity)
+        self.run_job = run_job
+        self.heartbeat_interval = heartbeat_interval
+        self.running = 0
+        self.completed = 0
+        self._slots = threading.Condition()
+        self._stopped = threading.Event()
+        self._last_heartbeat = 0.0
+
+    def _heartbeat(self):
+        load = os.getloadavg()[0] if hasattr(os, "getloadavg") else None
+        self.broker.heartbeat(self.node_id, self.capacity, self.running, load)
+        self._last_heartbeat = time.monotonic()
+
+    def _execute(self, job):
+        try:
+            details = self.run_job(job) or {}
+            failed = details.get("returncode", 0) != 0
+            self.broker.report(job["id"], "failed" if failed else "finished", **details)
+        except Exception as e:
+            self.broker.report(job["id"], "failed", error=f"{type(e).__name__}: {e}")
+        finally:
+            with self._slots:
+                self.running -= 1
+                self.completed += 1
+                self._slots.notify_all()
+
+    def run(self):
+        """Pull and run jobs until stop() is called"""
+        poll = min(1.0, self.heartbeat_interval)
+        try:
+            self._heartbeat()
+            while not self._stopped.is_set():
+                if time.monotonic() - self._last_heartbeat >= self.heartbeat_interval:
+                    self._heartbeat()
+
+                with self._slots:
+                    if self.running >= self.capacity:
+                        self._slots.wait(poll)
+                        continue
+
+                job = self.broker.fetch(self.node_id, timeout=poll)
+                if job is None:
+                    continue
+                with self._slots:
+                    self.running += 1
+                threading.Thread(target=self._execute, args=(job,),
+                                 name=f"job-{job['id']}", daemon=True).start()
+                # Tell the front ends about the new load straight away
+                self._heartbeat()
+        finally:
+            self.broker.leave(self.node_id)
+
+    def start(self):
+        """Run the worker in a background thread"""
+        thread = threading.Thread(target=self.run, name=f"worker-{self.node_id}", daemon=True)
+        thread.start()
+        return thread
+
+    def stop(self):
+        """Stop pulling jobs; jobs already running are left to finish"""
+        self._stopped.set()
@@ -0,0 +1,194 @@
+"""
+Continuous (swept) collision detection for axis-aligned boxes
+
+Instead of testing where a box ends up after a move, the move is swept:
+the time of impact along the path is computed against every candidate
+collider, so a fast box, or a large timestep, cannot skip over a thin
+platform. Moves are resolved one axis at a time (x, then y), which lets a
+box slide along a surface it has hit, and every hit is reported as a
+Contact with the surface normal.
+
+Candidate colliders come from a Broadphase, a uniform grid that only
+returns the objects near the swept area, so the cost does not grow with
+the size of the level.
+"""
+import math
+
+class Contact:
+    """A collision found while moving a box"""
+
+    __slots__ = ("other", "time", "normal_x", "normal_y")
+
+    def __init__(self, other, time, normal_x, normal_y):
+        """
+        Describe a contact
+
+        Args:
+            other: Collider that was hit
+            time (float): Time of impact, as a fraction of the move (0-1)
+            normal_x (int): Surface normal, -1, 0 or 1 (-1 when hitting a left side)
+            normal_y (int): Surface normal, -1, 0 or 1 (-1 when landing on a top)
+        """
+        self.other = other
+        self.time = time
+        self.normal_x = normal_x
+        self.normal_y = normal_y
+
+def sweep_aabb(x, y, width, height, dx, dy, other_x, other_y, other_width, other_height):
+    """
+    Find when a moving box first touches a static box
+
+    Args:
+        x, y, width, height (float): Moving box at the start of the move
+        dx, dy (float): Movement
+        other_x, other_y, other_width, other_height (float): Static box
+
+    Returns:
+        tuple: (time, normal_x, normal_y), with time the fraction of the
+            move at which the boxes touch, or None if they do not touch
+            during the move or already overlap at its start
+    """
+    if dx > 0:
+        x_entry = (other_x - (x + width)) / dx
+        x_exit = (other_x + other_width - x) / dx
+    elif dx < 0:
+        x_entry = (other_x + other_width - x) / dx
+        x_exit = (other_x - (x + width)) / dx
+    elif x + width <= other_x or x >= other_x + other_width:
+        return None
+    else:
+        x_entry, x_exit = -math.inf, math.inf
+
+    if dy > 0:
+        y_entry = (other_y - (y + height)) / dy
+        y_exit = (other_y + other_height - y) / dy
+    elif dy < 0:
+        y_entry = (other_y + other_height - y) / dy
+        y_exit = (other_y - (y + height)) / dy
+    elif y + height <= other_y or y >= other_y + other_height:
+        return None
+    else:
+        y_entry, y_exit = -math.inf, math.inf
+
+    entry = max(x_entry, y_entry)
+    if entry < 0 or entry > 1 or entry >= min(x_exit, y_exit):
+        return None
+
+    if x_entry > y_entry:
+        return entry, (-1 if dx > 0 else 1), 0
+    return entry, 0, (-1 if dy > 0 else 1)
+
+class Broadphase:
+    """Uniform grid of static colliders"""
+
+    def __init__(self, colliders=(), cell_size=64):
+        """
+        Build the grid
+
+        Args:
+            colliders (iterable): Objects with x, y, width and height
+            cell_size (int): Grid cell size in pixels
+        """
+        self.cell_size = cell_size
+        self._cells = {}
+        self._count = 0
+        for collider in colliders:
+            self.insert(collider)
+
+    def __len__(self):
+        return self._count
+
+    def _cell_range(self, left, top, right, bottom):
+        size = self.cell_size
+        return (range(int(left // size), int(right // size) + 1),
+                range(int(top // size), int(bottom // size) + 1))
+
+    def insert(self, collider):
+        """Add a collider to every cell it covers"""
+        columns, rows = self._cell_range(collider.x, collider.y, collider.x + collider.width,
+                                         collider.y + collider.height)
+        cells = self._cells
+        for column in columns:
+            for row in rows:
+                cells.setdefault((column, row), []).append(collider)
+        self._count += 1
+
+    def query(self, left, top, right, bottom):
+        """
+        Colliders that may touch an area
+
+        Returns:
+            list: Colliders in the cells the area covers, each once, in the
+                order they were inserted per cell
+        """
+        columns, rows = self._cell_range(left, top, right, bottom)
+        cells = self._cells
+        found = {}
+        for column in columns:
+            for row in rows:
+                for collider in cells.get((column, row), ()):
+                    found[id(collider)] = collider
+        return list(found.values())
+
+def _sweep_axis(x, y, width, height, dx, dy, colliders, one_way, step_up=0):
+    """Earliest contact of a single-axis move, or None"""
+    hit = None
+    bottom = y + height
+    for collider in colliders:
+        found = sweep_aabb(x, y, width, height, dx, dy,
+                           collider.x, collider.y, collider.width, collider.height)
+        if (found is None and dy > 0 and collider.y < bottom <= collider.y + step_up and
+                x + width > collider.x and x < collider.x + collider.width):
+            # Starts with its bottom just inside the top: step up onto it
+            found = (0.0, 0, -1)
+        if found is None or (one_way and found[2] != -1):
+            continue
+        if hit is None or found[0] < hit.time:
+            hit = Contact(collider, found[0], found[1], found[2])
+    return hit
+
+def move_and_collide(x, y, width, height, dx, dy, broadphase, one_way=False, step_up=0):
+    """
+    Move a box, stopping at the first collider hit on each axis
+
+    Args:
+        x, y, width, height (float): Box at the start of the move
+        dx, dy (float): Movement
+        broadphase (Broadphase): Colliders to test against
+        one_way (bool): Treat the colliders as one-way platforms that only
+            stop a box falling onto their top
+        step_up (float): When moving down, also land on a collider whose top
+            the box's bottom starts at most this far below
+
+    Returns:
+        tuple: (x, y, contacts) with the resolved position and the list of
+            Contacts, at most one per axis
+    """
+    contacts = []
+
+    if dx and not one_way:
+        colliders = broadphase.query(min(x, x + dx), y, max(x, x + dx) + width, y + height)
+        hit = _sweep_axis(x, y, width, height, dx, 0, colliders, one_way)
+        if hit is None:
+            x += dx
+        else:
+            # Snap flush to the surface rather than to x + dx * time
+            other = hit.other
+            x = other.x - width if hit.normal_x < 0 else other.x + other.width
+            contacts.append(hit)
+    else:
+        x += dx
+
+    if dy and not (one_way and dy < 0):
+        colliders = broadphase.query(x, min(y, y + dy), x + width, max(y, y + dy) + height)
+        hit = _sweep_axis(x, y, width, height, 0, dy, colliders, one_way, step_up)
+        if hit is None:
+            y += dy
+        else:
+            other = hit.other
+            y = other.y - height if hit.normal_y < 0 else other.y + other.height
+            contacts.append(hit)
+    else:
+        y += dy
+
+    return x, y, contacts
@@ -6,25 +6,47 @@ import os
 import sys
 import json
 import random
+import inspect
 from importlib import import_module
 
 # Add the project root to the path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 from config.settings import DEFAULT_GAME_WIDTH, DEFAULT_GAME_HEIGHT, FPS, TEMPLATES_DIR, ASSETS_DIR
+from app.game_engine.input import InputRouter
+from app.game_engine.animation import Animator
+from app.game_engine.layers import Compositor, View
 
 class GameEngine:
     """
     Core game engine that generates and runs games based on templates and parameters
     """
     
-    def __init__(self):
-        """Initialize the game engine"""
+    def __init__(self, headless=False):
+        """
+        Initialize the game engine
+        
+        Args:
+            headless (bool): Render to an offscreen surface instead of a
+                window. Several headless engines can run in one process; their
+                input is passed to step() instead of read from pygame.
+        """
         pygame.init()
-        self.screen = pygame.display.set_mode((DEFAULT_GAME_WIDTH, DEFAULT_GAME_HEIGHT))
-        pygame.display.set_caption("AI Game Creator")
+        self.headless = headless
+        if headless:
+            self.screen = pygame.Surface((DEFAULT_GAME_WIDTH, DEFAULT_GAME_HEIGHT))
+        else:
+            self.screen = pygame.display.set_mode((DEFAULT_GAME_WIDTH, DEFAULT_GAME_HEIGHT))
+        self.set_caption("AI Game Creator")
         self.clock = pygame.time.Clock()
         self.running = False
+        self.input = InputRouter()
+        self.animator = Animator()
+        self.compositor = None
+        self.camera = (0, 0)
         self.game_objects = []
+        self.template_name = None
+        self.game_params = None
+        self.ticks = 0
         
     def create_game(self, template_name, game_params):
         """
@@ -48,9 +70,12 @@ class GameEngine:
             
             # Create game objects based on the template
             self.game_objects = template.create_game_objects(game_params, ASSETS_DIR)
+            self.template_name = template_name
+            self.game_params = game_params
+            self.ticks = 0
             
             # Set game title based on description
-            pygame.display.set_caption(f"AI Game: {game_params.get('game_type', 'Game')}")
+            self.set_caption(f"AI Game: {game_params.get('game_type', 'Game')}")
             
             return True
         except Exception as e:
@@ -62,40 +87,326 @@ class GameEngine:
         self.running = True
         
         while self.running:
-            # Handle events
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    self.running = False
-                # Pass events to game objects
-                for obj in self.game_objects:
-                    if hasattr(obj, 'handle_event'):
-                        obj.handle_event(event)
-            
-            # Update game objects
-            for obj in self.game_objects:
-                if hasattr(obj, 'update'):
-                    obj.update()
-            
-            # Render
-            self.screen.fill((0, 0, 0))  # Clear screen
-            
-            # Draw game objects
-            for obj in self.game_objects:
-                if hasattr(obj, 'draw'):
-                    obj.draw(self.screen)
-            
-            pygame.display.flip()
+            self.step()
             self.clock.tick(FPS)
         
         pygame.quit()
     
+    @property
+    def game_objects(self):
+        """Objects of the current game"""
+        return self._game_objects
+    
+    @game_objects.setter
+    def game_objects(self, game_objects):
+        self._game_objects = game_objects
+        self.bind_updates()
+        self.bind_input()
+        self.bind_animation()
+        self.bind_layers()
+    
+    def bind_updates(self):
+        """
+        Collect the objects that game managers update themselves
+        
+        Objects with a managed_objects() method update the objects it returns
+        from their own update() (e.g. a game manager moving the player before
+        resolving collisions); the engine does not update those again.
+        """
+        self._managed = collect_managed(self._game_objects)
+    
+    def bind_input(self):
+        """
+        Subscribe the game objects to the input router
+        
+        Objects with a bind_input(router) method subscribe to the events and
+        key state they need. Objects that only have handle_event(event)
+        receive every event, as before. Call this again after adding input
+        handling objects to game_objects in place.
+        """
+        self.input.clear()
+        self.input.subscribe(pygame.QUIT, lambda event: self.stop())
+        for obj in self._game_objects:
+            if hasattr(obj, 'bind_input'):
+                obj.bind_input(self.input)
+            elif hasattr(obj, 'handle_event'):
+                self.input.subscribe_all(obj.handle_event)
+    
+    def bind_animation(self):
+        """
+        Register the game objects' animations with the animator
+        
+        Objects with a bind_animation(animator) method add their animations,
+        which are then evaluated together once per tick from the simulation
+        tick count.
+        """
+        self.animator.clear()
+        for obj in self._game_objects:
+            if hasattr(obj, 'bind_animation'):
+                obj.bind_animation(self.animator)
+    
+    def bind_layers(self):
+        """
+        Collect the layers declared by the game objects
+        
+        Objects with a layers() method return the Layer list of their scene
+        (see app/game_engine/layers.py); frames are then composed from those
+        layers, and the objects the layers draw are not drawn again. Other
+        objects with a draw(screen) method are drawn on top, as before.
+        """
+        self.compositor = None
+        self._layered = set()
+        for obj in self._game_objects:
+            if hasattr(obj, 'layers'):
+                if self.compositor is None:
+                    self.compositor = Compositor()
+                self.compositor.add(*obj.layers())
+                self._layered.add(id(obj))
+        if self.compositor is not None:
+            self._layered.update(id(obj) for obj in self.compositor.objects())
+    
+    def set_caption(self, caption):
+        """Set the window title (ignored when headless)"""
+        if not self.headless:
+            pygame.display.set_caption(caption)
+    
+    def step(self, keys=None, events=None, render=True):
+        """
+        Advance the game by a single frame: input, update and render
+        
+        Args:
+            keys (iterable): Key constants held in this tick, used instead
+                of the keyboard
+            events (list): Events to handle instead of pygame's event queue
+            render (bool): Draw the frame; skip to only advance the game
+        """
+        if self.headless:
+            keys = () if keys is None else keys
+            events = () if events is None else events
+        elif events is None:
+            events = pygame.event.get()
+        
+        # Route events to their subscribers, then sample the held keys
+        for event in events:
+            self.input.dispatch(event)
+        self.input.poll(keys)
+        
+        # Move animated objects to their pose for this tick
+        self.animator.update(self.ticks)
+        
+        # Update game objects, leaving the managed ones to their manager
+        update_game_objects(self.game_objects, managed=self._managed)
+        
+        if render:
+            self.render()
+        self.ticks += 1
+    
+    def render(self):
+        """Draw the current frame"""
+        if self.compositor is not None:
+            self.compositor.render(self.screen, self.camera)
+        else:
+            self.screen.fill((0, 0, 0))  # Clear screen
+        
+        # Draw game objects that are not part of a layer
+        layered = self._layered
+        for obj in self.game_objects:
+            if id(obj) not in layered and hasattr(obj, 'draw'):
+                obj.draw(self.screen)
+        
+        if not self.headless:
+            pygame.display.flip()
+    
     def stop(self):
         """Stop the game loop"""
         self.running = False
+    
+    def save_snapshot(self, path):
+        """
+        Save the current game state to a binary snapshot file
+        
+        Args:
+            path (str): File to write
+        """
+        from app.game_engine.snapshot import write_snapshot
+        write_snapshot(path, self.game_objects, self.template_name, self.game_params, self.ticks)
+    
+    def load_snapshot(self, path):
+        """
+        Restore a game from a binary snapshot file
+        
+        Args:
+            path (str): Snapshot file to load
+            
+        Returns:
+            bool: Success or failure
+        """
+        from app.game_engine.snapshot import open_snapshot
+        try:
+            with open_snapshot(path) as snapshot:
+                self.game_objects = snapshot.build_game_objects()
+                self.template_name = snapshot.template_name
+                self.game_params = snapshot.game_params
+                self.ticks = snapshot.tick
+            
+            game_type = (self.game_params or {}).get('game_type', 'Game')
+            self.set_caption(f"AI Game: {game_type}")
+            return True
+        except Exception as e:
+            print(f"Error loading snapshot: {e}")
+            return False
+
+def collect_managed(game_objects):
+    """
+    Find the objects that a manager among game_objects updates itself
+    
+    Args:
+        game_objects (list): Objects created by a template
+        
+    Returns:
+        set: Ids of the objects returned by the managers' managed_objects()
+    """
+    managed = set()
+    for obj in game_objects:
+        if hasattr(obj, 'managed_objects'):
+            managed.update(id(managed_obj) for managed_obj in obj.managed_objects())
+    return managed
+
+# Whether each class's update() takes the dt argument, checked once per class
+_update_takes_dt = {}
+
+def takes_dt(obj):
+    """
+    Whether an object's update() accepts the tick length
+    
+    Objects written before dt was introduced define update(self); they
+    advance one frame per call.
+    """
+    cls = type(obj)
+    found = _update_takes_dt.get(cls)
+    if found is None:
+        try:
+            parameters = inspect.signature(obj.update).parameters.values()
+        except (TypeError, ValueError):
+            parameters = ()
+        found = _update_takes_dt[cls] = any(
+            p.kind in (p.POSITIONAL_ONLY, p.POSITIONAL_OR_KEYWORD, p.VAR_POSITIONAL)
+            for p in parameters)
+    return found
+
+def update_game_objects(game_objects, dt=1, managed=None):
+    """
+    Advance game objects by one tick without input or rendering
+    
+    Objects updated by a manager are skipped, so each object moves once
+    per tick, as in GameEngine.step(). Objects whose update() takes no dt
+    are updated once per frame of the tick instead.
+    
+    Args:
+        game_objects (list): Objects created by a template
+        dt (float): Length of the tick in frames; larger steps simulate the
+            same time in fewer ticks
+        managed (set): Ids of the managed objects, as returned by
+            collect_managed(); found from game_objects if omitted
+    """
+    if managed is None:
+        managed = collect_managed(game_objects)
+    for obj in game_objects:
+        if id(obj) in managed or not hasattr(obj, 'update'):
+            continue
+        if takes_dt(obj):
+            obj.update(dt)
+        else:
+            for _ in range(max(1, round(dt))):
+                obj.update()
+
+def serialize_game_objects(game_objects):
+    """
+    Describe the concrete level built by a template
+    
+    Args:
+        game_objects (list): Objects created by a template
+        
+    Returns:
+        list: One dict per object that has a position and size
+    """
+    level = []
+    for obj in game_objects:
+        rect = getattr(obj, 'rect', None)
+        if rect is None:
+            continue
+        level.append({
+            "type": type(obj).__name__,
+            "x": obj.x,
+            "y": obj.y,
+            "width": obj.width,
+            "height": obj.height
+        })
+    return level
+
+def _writes_back(method):
+    """Wrap an in-place Rect method so the change reaches the rect's owner"""
+    def changed(self, *args, **kwargs):
+        result = method(self, *args, **kwargs)
+        owner = getattr(self, "_owner", None)
+        if owner is not None:
+            owner._sync_from_rect(self)
+        return result
+    changed.__name__ = method.__name__
+    changed.__doc__ = method.__doc__
+    return changed
+
+class ObjectRect(pygame.Rect):
+    """
+    The pygame Rect of a GameObject
+    
+    Changes made to it in place (rect.x += 5, rect.center = ..., move_ip(),
+    ...) are written back to the object's x/y/width/height straight away.
+    pygame returns this class from the methods that make new rects (copy(),
+    move(), clip(), ...); those have no owner and are plain rects.
+    """
+    
+    __slots__ = ("_owner",)
+    
+    def __setattr__(self, name, value):
+        pygame.Rect.__setattr__(self, name, value)
+        if name != "_owner":
+            owner = getattr(self, "_owner", None)
+            if owner is not None:
+                owner._sync_from_rect(self)
+    
+    update = _writes_back(pygame.Rect.update)
+    normalize = _writes_back(pygame.Rect.normalize)
+    move_ip = _writes_back(pygame.Rect.move_ip)
+    inflate_ip = _writes_back(pygame.Rect.inflate_ip)
+    scale_by_ip = _writes_back(pygame.Rect.scale_by_ip)
+    clamp_ip = _writes_back(pygame.Rect.clamp_ip)
+    union_ip = _writes_back(pygame.Rect.union_ip)
+    unionall_ip = _writes_back(pygame.Rect.unionall_ip)
+
+# Moves an ObjectRect to its owner without writing back
+_sync_rect = pygame.Rect.update
 
 # Base game object class for templates to use
 class GameObject:
-    """Base class for all game objects"""
+    """
+    Base class for all game objects
+    
+    The float x/y/width/height attributes are the single source of truth for
+    the object's position and size. The pygame Rect used for collisions and
+    drawing is created on first use and synced from them whenever the rect
+    property is read, so updates never have to copy the position over.
+    Changes made to the rect in place are written back to x/y/width/height,
+    so the usual pygame idioms (self.rect.x += 5, rect.move_ip(...)) keep
+    working. A rect kept across a change to x/y is stale; read the property
+    again instead.
+    """
+    
+    __slots__ = ("x", "y", "width", "height", "color", "image", "_rect")
+    
+    # Numeric/boolean attributes beyond position, size and color that make up
+    # the object's state in a snapshot
+    snapshot_fields = ()
     
     def __init__(self, x, y, width, height, color=(255, 255, 255)):
         """Initialize the game object"""
@@ -104,24 +415,68 @@ class GameObject:
         self.width = width
         self.height = height
         self.color = color
-        self.rect = pygame.Rect(x, y, width, height)
         self.image = None
+        self._rect = None
+    
+    @property
+    def rect(self):
+        """pygame.Rect at the object's current position"""
+        rect = self._rect
+        if rect is None:
+            rect = self._rect = ObjectRect(self.x, self.y, self.width, self.height)
+            rect._owner = self
+        else:
+            _sync_rect(rect, self.x, self.y, self.width, self.height)
+        return rect
     
-    def update(self):
-        """Update the game object"""
-        self.rect.x = self.x
-        self.rect.y = self.y
+    @rect.setter
+    def rect(self, rect):
+        self.x, self.y, self.width, self.height = rect
+    
+    def _sync_from_rect(self, rect):
+        """Take over the values of a rect changed in place"""
+        x, y, width, height = rect
+        # Keep the fractional part of the values the change left alone
+        if x != int(self.x):
+            self.x = x
+        if y != int(self.y):
+            self.y = y
+        if width != int(self.width):
+            self.width = width
+        if height != int(self.height):
+            self.height = height
+    
+    def update(self, dt=1):
+        """
+        Update the game object
+        
+        Args:
+            dt (float): Length of the tick in frames
+        """
     
     def draw(self, screen):
         """Draw the game object"""
+        rect = self.rect
+        if isinstance(screen, View):
+            # Part of a scrolled layer: shift from world to view coordinates
+            rect = pygame.Rect(rect.x - screen.origin[0], rect.y - screen.origin[1],
+                               rect.width, rect.height)
         if self.image:
-            screen.blit(self.image, self.rect)
+            screen.blit(self.image, rect)
         else:
-            pygame.draw.rect(screen, self.color, self.rect)
+            pygame.draw.rect(screen, self.color, rect)
 
 class Player(GameObject):
     """Player game object"""
     
+    __slots__ = ("velocity_x", "velocity_y", "speed", "jump_power", "gravity", "on_ground")
+    snapshot_fields = __slots__
+    
+    # Keys that move the player, sampled once per tick
+    LEFT_KEY = pygame.K_LEFT
+    RIGHT_KEY = pygame.K_RIGHT
+    JUMP_KEY = pygame.K_SPACE
+    
     def __init__(self, x, y, width, height, color=(0, 255, 0)):
         """Initialize the player"""
         super().__init__(x, y, width, height, color)
@@ -132,29 +487,53 @@ class Player(GameObject):
         self.gravity = 0.5
         self.on_ground = False
     
+    def bind_input(self, router):
+        """Subscribe to the jump key and to the per-tick key state"""
+        router.subscribe(pygame.KEYDOWN, lambda event: self.jump(), key=self.JUMP_KEY)
+        router.add_poller(self.apply_keys)
+    
+    def apply_keys(self, keys):
+        """Set the horizontal velocity from the keys held in this tick"""
+        self.velocity_x = (keys[self.RIGHT_KEY] - keys[self.LEFT_KEY]) * self.speed
+    
+    def jump(self):
+        """Jump if standing on something"""
+        if self.on_ground:
+            self.velocity_y = -self.jump_power
+            self.on_ground = False
+    
     def handle_event(self, event):
-        """Handle player input events"""
+        """
+        Handle a single input event
+        
+        The engine drives the player through bind_input() instead; this is
+        kept for code that feeds events to the player directly.
+        """
         if event.type == pygame.KEYDOWN:
-            if event.key == pygame.K_LEFT:
+            if event.key == self.LEFT_KEY:
                 self.velocity_x = -self.speed
-            if event.key == pygame.K_RIGHT:
+            if event.key == self.RIGHT_KEY:
                 self.velocity_x = self.speed
-            if event.key == pygame.K_SPACE and self.on_ground:
-                self.velocity_y = -self.jump_power
-                self.on_ground = False
+            if event.key == self.JUMP_KEY:
+                self.jump()
         
         if event.type == pygame.KEYUP:
-            if event.key in (pygame.K_LEFT, pygame.K_RIGHT):
+            if event.key in (self.LEFT_KEY, self.RIGHT_KEY):
                 self.velocity_x = 0
     
-    def update(self):
-        """Update player position and physics"""
-        # Apply gravity
-        self.velocity_y += self.gravity
+    def update(self, dt=1):
+        """
+        Update player position and physics
         
-        # Update position
-        self.x += self.velocity_x
-        self.y += self.velocity_y
+        Args:
+            dt (float): Length of the tick in frames; the player ends up
+                where dt updates of one frame would have taken it
+        """
+        # Move, summing the fall of each frame: per frame, gravity is added
+        # to the velocity and then the velocity to the position
+        self.x += self.velocity_x * dt
+        self.y += self.velocity_y * dt + self.gravity * dt * (dt + 1) / 2
+        self.velocity_y += self.gravity * dt
         
         # Check boundaries (simple collision with screen edges)
         if self.x < 0:
@@ -167,8 +546,7 @@ class Player(GameObject):
             self.velocity_y = 0
             self.on_ground = True
         
-        # Update rect position
-        super().update()
+        super().update(dt)
 
 # Example test function
 def test_engine():
@@ -0,0 +1,101 @@
+"""
+Input routing for the game engine
+
+Handlers subscribe to the event types (and keys) they care about, so an
+event only reaches its subscribers instead of every game object. Once per
+tick, after the events have been dispatched, the router polls the keyboard
+and hands the key-state snapshot to its pollers, so continuous input such
+as movement is sampled in step with the simulation.
+"""
+import pygame
+
+class HeldKeys:
+    """Key-state snapshot built from a collection of held keys"""
+
+    __slots__ = ("_held",)
+
+    def __init__(self, held=()):
+        self._held = frozenset(held)
+
+    def __getitem__(self, key):
+        return key in self._held
+
+class InputRouter:
+    """Routes pygame events by type and key, and polls key state per tick"""
+
+    def __init__(self):
+        """Initialize the router"""
+        self._handlers = {}
+        self._catch_all = []
+        self._pollers = []
+        self.keys = None
+
+    def subscribe(self, event_type, handler, key=None):
+        """
+        Call a handler for matching events
+
+        Args:
+            event_type (int): pygame event type, e.g. pygame.KEYDOWN
+            handler (callable): Called with the event
+            key (int): Only route events for this key (e.g. pygame.K_SPACE)
+        """
+        self._handlers.setdefault((event_type, key), []).append(handler)
+
+    def subscribe_all(self, handler):
+        """
+        Call a handler for every event
+
+        Args:
+            handler (callable): Called with the event
+        """
+        self._catch_all.append(handler)
+
+    def add_poller(self, poller):
+        """
+        Call a function with the key-state snapshot once per tick
+
+        Args:
+            poller (callable): Called with the sequence returned by
+                pygame.key.get_pressed()
+        """
+        self._pollers.append(poller)
+
+    def clear(self):
+        """Remove all handlers and pollers"""
+        self._handlers.clear()
+        self._catch_all.clear()
+        self._pollers.clear()
+
+    def dispatch(self, event):
+        """
+        Route an event to its subscribers
+
+        Args:
+            event (pygame.event.Event): Event to route
+        """
+        handlers = self._handlers
+        if handlers:
+            key = getattr(event, "key", None)
+            if key is not None:
+                for handler in handlers.get((event.type, key), ()):
+                    handler(event)
+            for handler in handlers.get((event.type, None), ()):
+                handler(event)
+        for handler in self._catch_all:
+            handler(event)
+
+    def poll(self, keys=None):
+        """
+        Take the key-state snapshot for this tick and pass it to the pollers
+
+        Args:
+            keys (iterable): Key constants held in this tick, used instead of
+                the keyboard (useful for scripted input)
+        """
+        self.keys = pygame.key.get_pressed() if keys is None else HeldKeys(keys)
+        for poller in self._pollers:
+            poller(self.keys)
+
+    def is_pressed(self, key):
+        """Whether a key was held in this tick's snapshot"""
+        return bool(self.keys and self.keys[key])
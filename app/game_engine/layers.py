@@ -0,0 +1,223 @@
+"""
+Layered frame composition
+
+Templates describe their scene as an ordered list of layers instead of
+drawing everything every frame:
+
+    static   scenery that does not move (platforms, the goal). It is drawn
+             once into a cached surface ("baked") and then blitted, so its
+             per-frame cost does not grow with the amount of geometry. Call
+             invalidate() after changing it to have it baked again.
+    dynamic  moving objects, drawn every frame
+    hud      overlays such as the score, drawn every frame on top of the
+             scene and never scrolled
+
+Static and dynamic layers can scroll with the camera at their own rate
+(parallax); a layer with parallax (0.5, 0.5) moves at half the camera's
+speed, e.g. for distant backgrounds. Objects draw in world coordinates,
+which may extend past the screen. A scrolled layer is drawn into a View,
+a surface the size of the screen that knows which world position its top
+left corner shows, and GameObject.draw() shifts objects by that origin.
+Static layers are baked in screen-sized tiles, each drawn when it first
+comes into view, and only the last MAX_TILES tiles used are kept, so
+memory stays the same however large the level or far the camera.
+"""
+import pygame
+
+STATIC = "static"
+DYNAMIC = "dynamic"
+HUD = "hud"
+
+# Baked tiles kept per static layer; a frame shows at most four
+MAX_TILES = 9
+
+class View(pygame.Surface):
+    """
+    A surface showing part of the world
+
+    origin is the world position drawn at the surface's (0, 0); whatever is
+    drawn into it in world coordinates must be shifted by -origin.
+    """
+
+    origin = (0, 0)
+
+    def __init__(self, size, origin=(0, 0), flags=0):
+        super().__init__(size, flags)
+        self.origin = origin
+
+class Layer:
+    """One layer of a template's scene"""
+
+    def __init__(self, name, kind, objects=(), draw=None, parallax=(1.0, 1.0), background=None):
+        """
+        Describe a layer
+
+        Args:
+            name (str): Layer name, used to invalidate it
+            kind (str): STATIC, DYNAMIC or HUD
+            objects (iterable): Game objects this layer draws; the engine does
+                not draw them again on its own
+            draw (callable): Called with the target surface to draw the layer;
+                draws each of objects when omitted
+            parallax (tuple): Share of the camera movement the layer follows
+            background (tuple): Fill color for a static layer; it is then
+                baked without transparency and covers the whole frame
+        """
+        if kind not in (STATIC, DYNAMIC, HUD):
+            raise ValueError(f"Unknown layer kind: {kind}")
+        self.name = name
+        self.kind = kind
+        self.objects = list(objects)
+        self._draw = draw
+        self.parallax = parallax
+        self.background = background
+        self.tiles = {}
+        self.view_size = None
+        self.surface = None
+        self.dirty = True
+
+    def draw(self, surface):
+        """Draw the layer's contents directly onto a surface"""
+        if self._draw is not None:
+            self._draw(surface)
+        else:
+            for obj in self.objects:
+                obj.draw(surface)
+
+    def invalidate(self):
+        """Have a static layer baked again before it is next shown"""
+        self.dirty = True
+
+    def offset(self, camera):
+        """Blit position of the layer for a camera position"""
+        if self.kind == HUD:
+            return (0, 0)
+        return (-int(camera[0] * self.parallax[0]), -int(camera[1] * self.parallax[1]))
+
+    def bake(self, size):
+        """
+        Start baking a static layer afresh
+
+        Args:
+            size (tuple): Size of the view, which is also the tile size
+        """
+        self.tiles.clear()
+        self.view_size = size
+        self.dirty = False
+
+    def tile(self, column, row):
+        """
+        Baked tile of a static layer
+
+        Args:
+            column, row (int): Tile position, in tiles from the world origin
+
+        Returns:
+            View: The tile, drawn now if it was not cached
+        """
+        key = (column, row)
+        tile = self.tiles.pop(key, None)
+        if tile is None:
+            width, height = self.view_size
+            origin = (column * width, row * height)
+            if self.background is not None:
+                tile = View(self.view_size, origin)
+                tile.fill(self.background)
+            else:
+                tile = View(self.view_size, origin, pygame.SRCALPHA)
+            self.draw(tile)
+        # Most recently used last; drop the least recently used
+        self.tiles[key] = tile
+        if len(self.tiles) > MAX_TILES:
+            del self.tiles[next(iter(self.tiles))]
+        return tile
+
+class Compositor:
+    """Composes frames from layers, keeping static layers baked"""
+
+    def __init__(self, layers=(), background=(0, 0, 0)):
+        """
+        Initialize the compositor
+
+        Args:
+            layers (iterable): Layers, from back to front
+            background (tuple): Color used where no opaque layer covers the frame
+        """
+        self.layers = list(layers)
+        self.background = background
+
+    def add(self, *layers):
+        """Add layers in front of the existing ones"""
+        self.layers.extend(layers)
+
+    def get(self, name):
+        """Return the layer with a name, or None"""
+        for layer in self.layers:
+            if layer.name == name:
+                return layer
+        return None
+
+    def invalidate(self, name=None):
+        """
+        Have static layers baked again
+
+        Args:
+            name (str): Layer to invalidate, all layers when omitted
+        """
+        for layer in self.layers:
+            if name is None or layer.name == name:
+                layer.invalidate()
+
+    def objects(self):
+        """Game objects drawn by the layers"""
+        return [obj for layer in self.layers for obj in layer.objects]
+
+    def render(self, surface, camera=(0, 0)):
+        """
+        Compose a frame
+
+        Args:
+            surface (pygame.Surface): Target surface
+            camera (tuple): Camera position in world coordinates
+        """
+        size = surface.get_size()
+        first = self.layers[0] if self.layers else None
+        if not (first and first.kind == STATIC and first.background is not None):
+            surface.fill(self.background)
+
+        for layer in self.layers:
+            if layer.kind == STATIC:
+                if layer.dirty or layer.view_size != size:
+                    layer.bake(size)
+                self._blit_tiles(layer, surface, layer.offset(camera))
+            else:
+                offset = layer.offset(camera)
+                if offset == (0, 0):
+                    layer.draw(surface)
+                else:
+                    self._draw_scrolled(layer, surface, offset)
+    
+    def _blit_tiles(self, layer, surface, offset):
+        """Blit the baked tiles of a static layer that are in view"""
+        width, height = layer.view_size
+        left, top = -offset[0], -offset[1]
+        for row in range(top // height, (top + height - 1) // height + 1):
+            for column in range(left // width, (left + width - 1) // width + 1):
+                surface.blit(layer.tile(column, row),
+                             (column * width + offset[0], row * height + offset[1]))
+    
+    def _draw_scrolled(self, layer, surface, offset):
+        """
+        Draw a scrolled per-frame layer
+        
+        The layer is drawn into a transparent View the size of the frame,
+        with its origin at the world position in view, and blitted on top.
+        """
+        size = surface.get_size()
+        scratch = layer.surface
+        if scratch is None or scratch.get_size() != size:
+            scratch = layer.surface = View(size, flags=pygame.SRCALPHA)
+        scratch.origin = (-offset[0], -offset[1])
+        scratch.fill((0, 0, 0, 0))
+        layer.draw(scratch)
+        surface.blit(scratch, (0, 0))
@@ -0,0 +1,435 @@
+"""
+Compact binary snapshot format for levels and game state
+
+A snapshot stores the concrete objects of a game so it can be saved,
+restored or cloned without re-running the template's random generation.
+
+Layout (version 2, little-endian, every section 8-byte aligned):
+
+    header     magic "AGCS", version, type count, entity count,
+               metadata length, simulation tick
+    metadata   UTF-8 JSON: template, game params, type table (with the
+               entity count of each type), object order and the state of
+               composite objects (e.g. the game manager)
+    color      uint8[count * 3]      RGB
+    x, y, width, height
+               float64[count] each   geometry
+    fields     float64[type count] per type and field, in type table order:
+               the fields listed in each class's snapshot_fields
+
+Entities are stored grouped by type, so each type is a contiguous range of
+every column and only carries its own fields. Loading builds each type's
+objects together and assigns them a whole column at a time.
+
+Entities are objects with a rect. Every other object in the game (such as
+PlatformerGame) is a composite: its plain attributes are stored in the
+metadata and its references to entities are stored as entity indices.
+Loading only builds classes from the app package (entities must be
+GameObjects), so a snapshot from elsewhere cannot import other modules.
+
+The fixed-width columns are exposed as memoryviews straight over the
+buffer, so opening a memory-mapped snapshot does not copy the level data.
+"""
+import gc
+import os
+import sys
+import json
+import mmap
+import struct
+from array import array
+from collections import deque
+from importlib import import_module
+from itertools import repeat
+
+MAGIC = b"AGCS"
+FORMAT_VERSION = 2
+
+HEADER = struct.Struct("<4sHHIIQ")
+
+# Package whose classes a snapshot may name
+TRUSTED_PACKAGE = "app"
+FLOAT_COLUMNS = ("x", "y", "width", "height")
+
+def _align(size):
+    """Round a section size up to the next multiple of 8 bytes"""
+    return (size + 7) & ~7
+
+def _float_bytes(values):
+    """Pack floats as little-endian float64"""
+    data = array("d", values)
+    if sys.byteorder == "big":
+        data.byteswap()
+    return data.tobytes()
+
+def _float_view(buffer):
+    """View little-endian float64 bytes as floats, copying only on big-endian hosts"""
+    if sys.byteorder == "big":
+        data = array("d", bytes(buffer))
+        data.byteswap()
+        return memoryview(data)
+    return buffer.cast("d")
+
+def _type_key(obj):
+    cls = type(obj)
+    return f"{cls.__module__}:{cls.__qualname__}"
+
+def _load_type(key, base=None):
+    """
+    Resolve a class named in a snapshot's type table
+
+    Snapshots move between machines, so the names are not trusted: only
+    classes defined in the app package are loaded, and only subclasses of
+    base when it is given.
+    """
+    module_name, _, qualname = key.partition(":")
+    if module_name.split(".")[0] != TRUSTED_PACKAGE:
+        raise ValueError(f"Untrusted type in game snapshot: {key}")
+    try:
+        obj = import_module(module_name)
+        for part in qualname.split("."):
+            obj = getattr(obj, part)
+    except (ImportError, AttributeError):
+        raise ValueError(f"Unknown type in game snapshot: {key}")
+    if (not isinstance(obj, type) or obj.__module__ != module_name or
+            obj.__qualname__ != qualname or (base is not None and not issubclass(obj, base))):
+        raise ValueError(f"Untrusted type in game snapshot: {key}")
+    return obj
+
+def _check_name(name):
+    """Refuse attribute names a snapshot must not set"""
+    if not isinstance(name, str) or name.startswith("__"):
+        raise ValueError(f"Invalid attribute in game snapshot: {name!r}")
+    return name
+
+def _is_entity(obj):
+    return hasattr(obj, "rect") and hasattr(obj, "x")
+
+def _assign(objects, name, values):
+    """Set one attribute on each object from a column of values"""
+    deque(map(setattr, objects, repeat(name), values), maxlen=0)
+
+def pack_snapshot(game_objects, template_name=None, game_params=None, tick=0):
+    """
+    Encode game objects into snapshot bytes
+
+    Args:
+        game_objects (list): Objects of a running or freshly created game
+        template_name (str): Template the game was created from
+        game_params (dict): Parameters the game was created from
+        tick (int): Simulation tick the snapshot was taken at
+
+    Returns:
+        bytes: Encoded snapshot
+    """
+    found = []
+    seen = set()
+    composites = []
+
+    def add_entity(obj):
+        if id(obj) not in seen:
+            seen.add(id(obj))
+            found.append(obj)
+
+    # Object order, with entities resolved to their index once grouped
+    listed = []
+    for obj in game_objects:
+        if _is_entity(obj):
+            add_entity(obj)
+            listed.append(obj)
+        else:
+            listed.append(None)
+            composites.append(obj)
+
+    # Composites may reference entities that are not in the object list
+    for composite in composites:
+        for value in vars(composite).values():
+            for item in (value if isinstance(value, list) else [value]):
+                if _is_entity(item):
+                    add_entity(item)
+
+    types = []
+    type_index = {}
+    kinds = []
+    for obj in found:
+        key = _type_key(obj)
+        if key not in type_index:
+            fields = list(getattr(type(obj), "snapshot_fields", ()))
+            type_index[key] = len(types)
+            types.append({
+                "type": key,
+                "fields": fields,
+                "bools": [f for f in fields if isinstance(getattr(obj, f), bool)],
+                "count": 0
+            })
+        kinds.append(type_index[key])
+        types[kinds[-1]]["count"] += 1
+
+    # Group the entities by type, keeping their order within a type
+    entities = [obj for _, obj in sorted(zip(kinds, found), key=lambda pair: pair[0])]
+    entity_index = {id(obj): index for index, obj in enumerate(entities)}
+
+    # Object order as runs: ["e", first entity, count] or ["c", composite]
+    order = []
+    composite_count = 0
+    for obj in listed:
+        if obj is None:
+            order.append(["c", composite_count])
+            composite_count += 1
+            continue
+        index = entity_index[id(obj)]
+        last = order[-1] if order else None
+        if last and last[0] == "e" and last[1] + last[2] == index:
+            last[2] += 1
+        else:
+            order.append(["e", index, 1])
+
+    composite_state = []
+    for composite in composites:
+        refs = {}
+        state = {}
+        for name, value in vars(composite).items():
+            if _is_entity(value):
+                refs[name] = entity_index[id(value)]
+            elif isinstance(value, list) and all(_is_entity(item) for item in value):
+                refs[name] = [entity_index[id(item)] for item in value]
+            elif isinstance(value, (bool, int, float, str, type(None))):
+                state[name] = value
+        composite_state.append({"type": _type_key(composite), "refs": refs, "state": state})
+
+    metadata = json.dumps({
+        "template": template_name,
+        "game_params": game_params,
+        "types": types,
+        "order": order,
+        "composites": composite_state
+    }).encode("utf-8")
+
+    colors = bytearray()
+    for obj in entities:
+        colors.extend(tuple(obj.color)[:3])
+
+    sections = [
+        metadata,
+        bytes(colors),
+        *(_float_bytes(getattr(obj, column) for obj in entities) for column in FLOAT_COLUMNS)
+    ]
+    start = 0
+    for info in types:
+        members = entities[start:start + info["count"]]
+        start += info["count"]
+        sections.extend(_float_bytes(float(getattr(obj, field)) for obj in members)
+                        for field in info["fields"])
+
+    out = bytearray(HEADER.pack(MAGIC, FORMAT_VERSION, len(types), len(entities),
+                                len(metadata), tick))
+    out.extend(bytes(_align(len(out)) - len(out)))
+    for section in sections:
+        out.extend(section)
+        out.extend(bytes(_align(len(section)) - len(section)))
+    return bytes(out)
+
+class LevelSnapshot:
+    """
+    Decoded view over snapshot bytes
+
+    The columns (color, x, y, width, height, and per type the fields in
+    type_fields) are memoryviews over the underlying buffer; call
+    build_game_objects() to turn them back into game objects.
+    """
+
+    def __init__(self, buffer, _mmap=None, _file=None):
+        """
+        Decode a snapshot
+
+        Args:
+            buffer: bytes-like object holding an encoded snapshot
+        """
+        self._mmap = _mmap
+        self._file = _file
+        self._buffer = None
+        try:
+            self._decode(buffer)
+        except Exception:
+            self.close()
+            raise
+
+    def _decode(self, buffer):
+        """Check the header and map the sections of the buffer"""
+        if len(buffer) < HEADER.size:
+            raise ValueError("Not a game snapshot: file is too short")
+        magic, version, type_count, count, meta_len, tick = HEADER.unpack_from(buffer)
+        if magic != MAGIC:
+            raise ValueError("Not a game snapshot: bad magic number")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported snapshot version {version} (expected {FORMAT_VERSION})")
+
+        self.version = version
+        self.tick = tick
+        self.count = count
+        self._buffer = memoryview(buffer)
+
+        offset = _align(HEADER.size)
+
+        def section(size):
+            nonlocal offset
+            if offset + size > len(self._buffer):
+                raise ValueError("Corrupt game snapshot: truncated data")
+            view = self._buffer[offset:offset + size]
+            offset += _align(size)
+            return view
+
+        self.metadata = json.loads(bytes(section(meta_len)).decode("utf-8"))
+        types = self.metadata["types"]
+        if len(types) != type_count or sum(info["count"] for info in types) != count:
+            raise ValueError("Corrupt game snapshot: type table does not match the header")
+        self.color = section(count * 3)
+        for column in FLOAT_COLUMNS:
+            setattr(self, column, _float_view(section(count * 8)))
+        # Per type, its fields' columns
+        self.type_fields = [
+            {field: _float_view(section(info["count"] * 8)) for field in info["fields"]}
+            for info in types
+        ]
+
+    @property
+    def template_name(self):
+        return self.metadata["template"]
+
+    @property
+    def game_params(self):
+        return self.metadata["game_params"]
+
+    def __len__(self):
+        return self.count
+
+    def build_game_objects(self):
+        """
+        Recreate the game objects stored in the snapshot
+
+        Returns:
+            list: Game objects in their original order
+        """
+        # Allocating tens of thousands of objects would set off the cyclic
+        # garbage collector over and over, doubling the load time; it is
+        # put off until they are all built
+        collecting = gc.isenabled()
+        gc.disable()
+        try:
+            return self._build_game_objects()
+        finally:
+            if collecting:
+                gc.enable()
+
+    def _build_game_objects(self):
+        from app.game_engine.engine import GameObject
+
+        xs, ys = self.x.tolist(), self.y.tolist()
+        widths, heights = self.width.tolist(), self.height.tolist()
+        colors = bytes(self.color)
+
+        entities = []
+        start = 0
+        for info, fields in zip(self.metadata["types"], self.type_fields):
+            cls = _load_type(info["type"], GameObject)
+            unknown = set(fields) - set(getattr(cls, "snapshot_fields", ()))
+            if unknown:
+                raise ValueError(f"Unknown fields for {info['type']} in game snapshot: "
+                                 f"{sorted(unknown)}")
+            end = start + info["count"]
+            # Build the type's objects without __init__, then fill in what
+            # GameObject.__init__ sets and the saved fields, a column at a time
+            objects = list(map(cls.__new__, repeat(cls, end - start)))
+            _assign(objects, "x", xs[start:end])
+            _assign(objects, "y", ys[start:end])
+            _assign(objects, "width", widths[start:end])
+            _assign(objects, "height", heights[start:end])
+            rgb = colors[start * 3:end * 3]
+            _assign(objects, "color", zip(rgb[0::3], rgb[1::3], rgb[2::3]))
+            _assign(objects, "image", repeat(None))
+            _assign(objects, "_rect", repeat(None))
+            bools = set(info["bools"])
+            for field, column in fields.items():
+                values = column.tolist()
+                _assign(objects, field, map(bool, values) if field in bools else values)
+            entities.extend(objects)
+            start = end
+
+        composites = []
+        for info in self.metadata["composites"]:
+            cls = _load_type(info["type"])
+            obj = cls.__new__(cls)
+            for name, ref in info["refs"].items():
+                if isinstance(ref, list):
+                    setattr(obj, _check_name(name), [entities[i] for i in ref])
+                else:
+                    setattr(obj, _check_name(name), entities[ref])
+            for name, value in info["state"].items():
+                setattr(obj, _check_name(name), value)
+            composites.append(obj)
+
+        game_objects = []
+        for run in self.metadata["order"]:
+            if run[0] == "e":
+                game_objects.extend(entities[run[1]:run[1] + run[2]])
+            else:
+                game_objects.append(composites[run[1]])
+        return game_objects
+
+    def close(self):
+        """Release the buffer and the memory map behind it"""
+        views = [getattr(self, name, None) for name in ("color", *FLOAT_COLUMNS)]
+        for fields in getattr(self, "type_fields", ()):
+            views.extend(fields.values())
+        for view in views:
+            if isinstance(view, memoryview):
+                view.release()
+        if self._buffer is not None:
+            self._buffer.release()
+            self._buffer = None
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def write_snapshot(path, game_objects, template_name=None, game_params=None, tick=0):
+    """
+    Save game objects to a snapshot file
+
+    Args:
+        path (str): File to write
+        game_objects (list): Objects of a running or freshly created game
+        template_name (str): Template the game was created from
+        game_params (dict): Parameters the game was created from
+        tick (int): Simulation tick the snapshot was taken at
+    """
+    data = pack_snapshot(game_objects, template_name, game_params, tick)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+def open_snapshot(path):
+    """
+    Memory-map a snapshot file
+
+    Args:
+        path (str): Snapshot file to open
+
+    Returns:
+        LevelSnapshot: Snapshot backed by the memory map; close it when done
+    """
+    f = open(path, "rb")
+    try:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except ValueError:
+        f.close()
+        raise ValueError("Not a game snapshot: file is empty")
+    return LevelSnapshot(mapped, _mmap=mapped, _file=f)
@@ -3,34 +3,51 @@ Platformer game template
 """
 import pygame
 import os
+import math
 import random
 import sys
-import math
 
 # Add the project root to the path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))))
 from app.game_engine.engine import GameObject, Player
+from app.game_engine.animation import BOB
+from app.game_engine.layers import Layer, STATIC, DYNAMIC, HUD
+from app.game_engine.collision import Broadphase, move_and_collide
 from config.settings import DEFAULT_GAME_WIDTH, DEFAULT_GAME_HEIGHT
 
 class Platform(GameObject):
     """Platform game object"""
+    __slots__ = ()
+    
     def __init__(self, x, y, width, height, color=(100, 100, 100)):
         super().__init__(x, y, width, height, color)
 
 class Collectible(GameObject):
     """Collectible game object"""
+    __slots__ = ("collected", "base_y")
+    snapshot_fields = __slots__
+    
+    # Bob up and down by this many pixels, once every BOB_PERIOD ticks
+    BOB_AMPLITUDE = 6
+    BOB_PERIOD = 75
+    
     def __init__(self, x, y, size=20, color=(255, 255, 0)):
         super().__init__(x, y, size, size, color)
         self.collected = False
+        self.base_y = y
     
-    def update(self):
-        super().update()
-        # Simple animation - bob up and down
-        self.y += math.sin(pygame.time.get_ticks() * 0.005) * 0.5
-        self.rect.y = self.y
+    def bind_animation(self, animator):
+        # Simple animation - bob up and down around the spawn position
+        if not hasattr(self, "base_y"):
+            # Restored from a snapshot taken before base_y was recorded
+            self.base_y = self.y
+        animator.add(self, "y", BOB, self.BOB_AMPLITUDE, self.BOB_PERIOD, base=self.base_y)
 
 class Enemy(GameObject):
     """Enemy game object"""
+    __slots__ = ("start_x", "patrol_distance", "direction", "speed")
+    snapshot_fields = __slots__
+    
     def __init__(self, x, y, width, height, patrol_distance=100, color=(255, 0, 0)):
         super().__init__(x, y, width, height, color)
         self.start_x = x
@@ -38,20 +55,45 @@ class Enemy(GameObject):
         self.direction = 1
         self.speed = 2
     
-    def update(self):
-        # Patrol back and forth
-        self.x += self.speed * self.direction
-        
-        # Change direction at patrol boundaries
-        if self.x > self.start_x + self.patrol_distance:
-            self.direction = -1
-        elif self.x < self.start_x:
-            self.direction = 1
+    def update(self, dt=1):
+        # Patrol back and forth, bouncing off the patrol boundaries so a
+        # long tick ends where that many short ones would
+        low, high = self.start_x, self.start_x + self.patrol_distance
+        x = self.x + self.speed * self.direction * dt
+        if high <= low:
+            x = low
+        while x > high or x < low:
+            if x > high:
+                x = 2 * high - x
+                self.direction = -1
+            else:
+                x = 2 * low - x
+                self.direction = 1
+        self.x = x
         
-        super().update()
+        super().update(dt)
 
 class PlatformerGame:
     """Platformer game manager"""
+    # Where the player is sent back to after touching an enemy
+    RESPAWN_POSITION = (100, 100)
+    
+    # A player falling with their feet at most this far into a platform
+    # lands on it, so a jump that tops out just short of a platform still
+    # reaches it
+    STEP_UP = 10
+    
+    # HUD caches, filled on first draw (class defaults so restored games have them too)
+    _fonts = None
+    _score_text = None
+    
+    # Collision grid of the platforms, built on first update
+    _broadphase = None
+    
+    # Player height after the last update; the next update sweeps the
+    # player's fall from there, including moves made in between
+    _sweep_y = None
+    
     def __init__(self, player, platforms, collectibles, enemies, goal):
         self.player = player
         self.platforms = platforms
@@ -61,22 +103,55 @@ class PlatformerGame:
         self.score = 0
         self.level_complete = False
     
-    def update(self):
-        """Update game state"""
+    def collision_world(self):
+        """
+        Return the broadphase of the platforms
+        
+        Platforms don't move, so the grid is only rebuilt when platforms are
+        added or removed.
+        """
+        if self._broadphase is None or len(self._broadphase) != len(self.platforms):
+            self._broadphase = Broadphase(self.platforms)
+        return self._broadphase
+    
+    def managed_objects(self):
+        """The player and enemies, which update() moves itself"""
+        return [self.player, *self.enemies]
+    
+    def update(self, dt=1):
+        """
+        Update game state
+        
+        Args:
+            dt (float): Length of the tick in frames
+        """
+        player = self.player
+        start_y = player.y if self._sweep_y is None else self._sweep_y
+        rise = player.velocity_y
+        
         # Player update
-        self.player.update()
-        
-        # Platform collisions
-        self.player.on_ground = False
-        for platform in self.platforms:
-            if (self.player.rect.bottom >= platform.rect.top and
-                self.player.rect.bottom <= platform.rect.top + 10 and
-                self.player.rect.right > platform.rect.left and
-                self.player.rect.left < platform.rect.right):
-                
-                self.player.on_ground = True
-                self.player.y = platform.rect.top - self.player.height
-                self.player.velocity_y = 0
+        player.update(dt)
+        
+        # A long tick can go up and come down again: the fall starts at the
+        # top of the jump, where the frame-by-frame velocity turned around
+        if rise < 0 < player.velocity_y and player.gravity > 0:
+            frames = math.floor(-rise / player.gravity)
+            top = start_y + rise * frames + player.gravity * frames * (frames + 1) / 2
+            start_y = min(start_y, top)
+        
+        # Platform collisions: sweep the fall so fast moves can't pass through
+        # a platform, and land on the first platform top in the way. The
+        # platforms are one-way and never stop horizontal movement, so only
+        # the vertical part of the move is swept, at the new x position.
+        _, landed_y, contacts = move_and_collide(
+            player.x, start_y, player.width, player.height,
+            0, player.y - start_y, self.collision_world(), one_way=True, step_up=self.STEP_UP)
+        player.on_ground = False
+        for contact in contacts:
+            if contact.normal_y < 0:
+                player.on_ground = True
+                player.y = landed_y
+                player.velocity_y = 0
         
         # Collectible collisions
         for collectible in self.collectibles:
@@ -86,53 +161,63 @@ class PlatformerGame:
         
         # Enemy collisions
         for enemy in self.enemies:
-            enemy.update()
+            enemy.update(dt)
             if self.player.rect.colliderect(enemy.rect):
                 # Reset player position on enemy collision
-                self.player.x = 100
-                self.player.y = 100
+                self.player.x, self.player.y = self.RESPAWN_POSITION
         
         # Goal collision
         if self.player.rect.colliderect(self.goal.rect):
+            # The completion message is displayed by draw()
             self.level_complete = True
-            # Display completion message
-            font = pygame.font.Font(None, 74)
-            text = font.render("Level Complete!", True, (0, 255, 0))
-            self.screen.blit(text, (DEFAULT_GAME_WIDTH // 2 - 200, DEFAULT_GAME_HEIGHT // 2))
-
-    def draw(self, screen):
-        """Draw all game elements"""
-        self.screen = screen
         
-        # Draw platforms
-        for platform in self.platforms:
-            platform.draw(screen)
+        self._sweep_y = self.player.y
+
+    def layers(self):
+        """
+        Describe the scene for the engine's compositor
         
-        # Draw collectibles
+        Returns:
+            list: The level geometry (baked once), the moving objects and the HUD
+        """
+        return [
+            Layer("level", STATIC, self.platforms + [self.goal], background=(0, 0, 0)),
+            Layer("actors", DYNAMIC, self.collectibles + self.enemies + [self.player],
+                  draw=self.draw_actors),
+            Layer("hud", HUD, draw=self.draw_hud)
+        ]
+    
+    def draw_actors(self, screen):
+        """Draw the collectibles, enemies and player"""
         for collectible in self.collectibles:
             if not collectible.collected:
                 collectible.draw(screen)
         
-        # Draw enemies
         for enemy in self.enemies:
             enemy.draw(screen)
         
-        # Draw goal
-        self.goal.draw(screen)
-        
-        # Draw player
         self.player.draw(screen)
+    
+    def draw_hud(self, screen):
+        """Draw the score and, once reached, the level complete message"""
+        if self._fonts is None:
+            self._fonts = (pygame.font.Font(None, 36), pygame.font.Font(None, 74))
+        score_font, message_font = self._fonts
         
-        # Draw score
-        font = pygame.font.Font(None, 36)
-        text = font.render(f"Score: {self.score}", True, (255, 255, 255))
-        screen.blit(text, (10, 10))
+        # Render the score text only when the score changes
+        if self._score_text is None or self._score_text[0] != self.score:
+            self._score_text = (self.score, score_font.render(f"Score: {self.score}", True, (255, 255, 255)))
+        screen.blit(self._score_text[1], (10, 10))
         
         # Draw level complete message if applicable
         if self.level_complete:
-            font = pygame.font.Font(None, 74)
-            text = font.render("Level Complete!", True, (0, 255, 0))
+            text = message_font.render("Level Complete!", True, (0, 255, 0))
             screen.blit(text, (DEFAULT_GAME_WIDTH // 2 - 200, DEFAULT_GAME_HEIGHT // 2))
+    
+    def draw(self, screen):
+        """Draw all game elements without caching (the engine composes layers() instead)"""
+        for layer in self.layers():
+            layer.draw(screen)
 
 def create_game_objects(game_params, assets_dir):
     """
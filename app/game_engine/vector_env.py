@@ -0,0 +1,396 @@
+"""
+Vectorized environment for running many platformer games in one process
+
+VectorPlatformerEnv steps N independent PlatformerGame levels in lockstep.
+The levels are flattened into struct-of-arrays state (one entry per game
+for the player, and concatenated per-game ranges for platforms,
+collectibles and enemies) and advanced by a single physics pass, with no
+display, surfaces or per-object method calls.
+
+The physics mirror one GameEngine.step() per step (input, the animation
+pass, then PlatformerGame.update(), which moves the player and enemies
+once), including the integer truncation of pygame rects, so a level
+behaves the same here as in the windowed game.
+
+Actions are one integer per game:
+    0 idle, 1 left, 2 right, 3 jump, 4 left + jump, 5 right + jump
+
+Observations are a flat array of num_envs * OBSERVATION_SIZE floats, one
+row per game with the fields in OBSERVATION_FIELDS.
+"""
+import os
+import sys
+import random
+from array import array
+from importlib import import_module
+
+# Add the project root to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from config.settings import DEFAULT_GAME_WIDTH, DEFAULT_GAME_HEIGHT, ASSETS_DIR
+from app.game_engine.animation import Animator, BOB, CURVE_SIZE
+
+IDLE, LEFT, RIGHT, JUMP, LEFT_JUMP, RIGHT_JUMP = range(6)
+NUM_ACTIONS = 6
+
+# Horizontal direction and jump flag for each action
+_ACTION_MOVES = ((0, False), (-1, False), (1, False), (0, True), (-1, True), (1, True))
+
+OBSERVATION_FIELDS = (
+    "player_x", "player_y", "velocity_x", "velocity_y", "on_ground",
+    "goal_dx", "goal_dy", "nearest_enemy_dx", "nearest_enemy_dy",
+    "collectibles_left", "score"
+)
+OBSERVATION_SIZE = len(OBSERVATION_FIELDS)
+
+def _find_manager(game_objects):
+    """Return the PlatformerGame-like manager among a template's objects"""
+    for obj in game_objects:
+        if all(hasattr(obj, name) for name in ("player", "platforms", "collectibles", "enemies", "goal")):
+            return obj
+    raise ValueError("Game objects do not contain a platformer game manager")
+
+class VectorPlatformerEnv:
+    """
+    Steps many platformer levels in lockstep from array-shaped actions
+    """
+
+    def __init__(self, levels, max_steps=1000, goal_reward=10.0, autoreset=True):
+        """
+        Initialize the environment from already built levels
+
+        Args:
+            levels (list): One list of game objects per game, as returned by
+                the platformer template's create_game_objects()
+            max_steps (int): Steps after which an episode is cut off
+            goal_reward (float): Reward for reaching the goal, on top of
+                one point per collectible
+            autoreset (bool): Reset finished games at the end of step()
+        """
+        if not levels:
+            raise ValueError("At least one level is required")
+
+        self.num_envs = len(levels)
+        self.max_steps = max_steps
+        self.goal_reward = goal_reward
+        self.autoreset = autoreset
+
+        n = self.num_envs
+        self._spawn_x = [0.0] * n
+        self._spawn_y = [0.0] * n
+        self._respawn_x = [0.0] * n
+        self._respawn_y = [0.0] * n
+        self.player_width = [0] * n
+        self.player_height = [0] * n
+        self.speed = [0.0] * n
+        self.jump_power = [0.0] * n
+        self.gravity = [0.0] * n
+        self.step_up = [0] * n
+
+        # Static geometry, concatenated; game i owns [start[i], start[i + 1])
+        self.platform_start = [0]
+        self.platform_left, self.platform_top, self.platform_right = [], [], []
+        self.collectible_start = [0]
+        self.collectible_left, self.collectible_right = [], []
+        self.collectible_height = []
+        # Bob animation of each collectible, as registered with an Animator
+        self.collectible_base, self.collectible_amplitude = [], []
+        self.collectible_period, self.collectible_offset, self.collectible_curve = [], [], []
+        self.enemy_start = [0]
+        self._enemy_spawn_x, self.enemy_y = [], []
+        self.enemy_width, self.enemy_height = [], []
+        self.enemy_start_x, self.enemy_patrol, self.enemy_speed = [], [], []
+        self.goal_left, self.goal_top, self.goal_right, self.goal_bottom = [], [], [], []
+
+        for i, game_objects in enumerate(levels):
+            game = _find_manager(game_objects)
+            player = game.player
+            self._spawn_x[i], self._spawn_y[i] = player.x, player.y
+            self._respawn_x[i], self._respawn_y[i] = getattr(game, "RESPAWN_POSITION", (player.x, player.y))
+            self.player_width[i], self.player_height[i] = int(player.width), int(player.height)
+            self.speed[i] = player.speed
+            self.jump_power[i] = player.jump_power
+            self.gravity[i] = player.gravity
+            self.step_up[i] = getattr(game, "STEP_UP", 0)
+
+            for platform in game.platforms:
+                self.platform_left.append(platform.x)
+                self.platform_top.append(platform.y)
+                self.platform_right.append(platform.x + platform.width)
+            self.platform_start.append(len(self.platform_left))
+
+            # Register the animations in engine order so phase offsets match
+            animator = Animator()
+            for obj in game_objects:
+                if hasattr(obj, "bind_animation"):
+                    obj.bind_animation(animator)
+
+            for collectible in game.collectibles:
+                rect = collectible.rect
+                self.collectible_left.append(rect.left)
+                self.collectible_right.append(rect.right)
+                self.collectible_height.append(rect.height)
+                tracks = [t for t in animator.tracks(collectible) if t[0] == "y"]
+                _, curve, amplitude, period, offset, base = tracks[0] if tracks else \
+                    ("y", BOB, 0.0, 1, 0, collectible.y)
+                self.collectible_base.append(base)
+                self.collectible_amplitude.append(amplitude)
+                self.collectible_period.append(period)
+                self.collectible_offset.append(offset)
+                self.collectible_curve.append(curve.table)
+            self.collectible_start.append(len(self.collectible_left))
+
+            for enemy in game.enemies:
+                self._enemy_spawn_x.append(enemy.x)
+                self.enemy_y.append(enemy.y)
+                self.enemy_width.append(int(enemy.width))
+                self.enemy_height.append(int(enemy.height))
+                self.enemy_start_x.append(enemy.start_x)
+                self.enemy_patrol.append(enemy.patrol_distance)
+                self.enemy_speed.append(enemy.speed)
+            self.enemy_start.append(len(self._enemy_spawn_x))
+
+            rect = game.goal.rect
+            self.goal_left.append(rect.left)
+            self.goal_top.append(rect.top)
+            self.goal_right.append(rect.right)
+            self.goal_bottom.append(rect.bottom)
+
+        # Dynamic state
+        self.player_x = list(self._spawn_x)
+        self.player_y = list(self._spawn_y)
+        self.velocity_x = [0.0] * n
+        self.velocity_y = [0.0] * n
+        self.on_ground = [False] * n
+        self.collected = bytearray(len(self.collectible_left))
+        self.enemy_x = list(self._enemy_spawn_x)
+        self.enemy_direction = [1] * len(self._enemy_spawn_x)
+        self.score = [0] * n
+        self.steps = [0] * n
+        self.goal_reached = [False] * n
+
+    @classmethod
+    def from_params(cls, game_params, num_envs, template_name="platformer", seed=0, **kwargs):
+        """
+        Build num_envs levels from a template
+
+        Args:
+            game_params (dict or list): Parameters shared by every game, or
+                one parameter dict per game
+            num_envs (int): Number of games
+            template_name (str): Template that builds the levels
+            seed (int): Game i is generated with random seed seed + i
+            **kwargs: Passed on to the constructor
+
+        Returns:
+            VectorPlatformerEnv: The environment
+        """
+        template = import_module(f"app.game_engine.templates.{template_name}")
+        if isinstance(game_params, dict):
+            game_params = [game_params] * num_envs
+        levels = []
+        for i in range(num_envs):
+            random.seed(seed + i)
+            levels.append(template.create_game_objects(game_params[i], ASSETS_DIR))
+        return cls(levels, **kwargs)
+
+    def reset(self, indices=None):
+        """
+        Put games back in their initial state
+
+        Args:
+            indices (iterable): Games to reset, all when omitted
+
+        Returns:
+            array: Observations of all games
+        """
+        for i in (range(self.num_envs) if indices is None else indices):
+            self.player_x[i] = self._spawn_x[i]
+            self.player_y[i] = self._spawn_y[i]
+            self.velocity_x[i] = 0.0
+            self.velocity_y[i] = 0.0
+            self.on_ground[i] = False
+            self.score[i] = 0
+            self.steps[i] = 0
+            self.goal_reached[i] = False
+            for c in range(self.collectible_start[i], self.collectible_start[i + 1]):
+                self.collected[c] = 0
+            for e in range(self.enemy_start[i], self.enemy_start[i + 1]):
+                self.enemy_x[e] = self._enemy_spawn_x[e]
+                self.enemy_direction[e] = 1
+        return self.observe()
+
+    def step(self, actions):
+        """
+        Advance every game by one tick
+
+        Args:
+            actions (sequence): One action per game
+
+        Returns:
+            tuple: (observations, rewards, dones, info) where observations is
+                a flat float array of num_envs * OBSERVATION_SIZE, rewards a
+                float array, dones a byte array and info holds "score",
+                "goal_reached" and "truncated" lists for the finished episodes
+                (taken before any automatic reset)
+        """
+        if len(actions) != self.num_envs:
+            raise ValueError(f"Expected {self.num_envs} actions, got {len(actions)}")
+
+        n = self.num_envs
+        width_limit = DEFAULT_GAME_WIDTH
+        height_limit = DEFAULT_GAME_HEIGHT
+        px, py = self.player_x, self.player_y
+        vx, vy = self.velocity_x, self.velocity_y
+        on_ground = self.on_ground
+        pw, ph = self.player_width, self.player_height
+        p_start, p_left, p_top, p_right = (self.platform_start, self.platform_left,
+                                           self.platform_top, self.platform_right)
+        c_start, collected = self.collectible_start, self.collected
+        c_left, c_right, c_height = self.collectible_left, self.collectible_right, self.collectible_height
+        c_base, c_amplitude, c_curve = self.collectible_base, self.collectible_amplitude, self.collectible_curve
+        c_period, c_offset = self.collectible_period, self.collectible_offset
+        curve_mask = CURVE_SIZE - 1
+        e_start, ex, ey = self.enemy_start, self.enemy_x, self.enemy_y
+        e_w, e_h, e_dir = self.enemy_width, self.enemy_height, self.enemy_direction
+        e_origin, e_patrol, e_speed = self.enemy_start_x, self.enemy_patrol, self.enemy_speed
+
+        rewards = array("d", bytes(8 * n))
+        dones = bytearray(n)
+        finished_score, finished_goal, finished_truncated = [], [], []
+
+        for i in range(n):
+            # Input, as Player.apply_keys() and Player.jump() would apply it
+            direction, jump = _ACTION_MOVES[actions[i]]
+            vx[i] = direction * self.speed[i]
+            if jump and on_ground[i]:
+                vy[i] = -self.jump_power[i]
+                on_ground[i] = False
+
+            # Player.update
+            vy[i] += self.gravity[i]
+            x = px[i] + vx[i]
+            y = py[i] + vy[i]
+            w, h = pw[i], ph[i]
+            if x < 0:
+                x = 0
+            if x > width_limit - w:
+                x = width_limit - w
+            if y > height_limit - h:
+                y = height_limit - h
+                vy[i] = 0
+
+            # Platform landing: sweep the fall from the last step's height and
+            # land on the first platform top in the way, or step up onto one
+            # the feet start just inside (see collision.move_and_collide)
+            grounded = False
+            dy = y - py[i]
+            if dy > 0:
+                feet = py[i] + h
+                step_up = self.step_up[i]
+                landing_time = None
+                for p in range(p_start[i], p_start[i + 1]):
+                    if x + w <= p_left[p] or x >= p_right[p]:
+                        continue
+                    time = (p_top[p] - feet) / dy
+                    if p_top[p] < feet <= p_top[p] + step_up:
+                        time = 0.0
+                    if 0 <= time <= 1 and (landing_time is None or time < landing_time):
+                        landing_time = time
+                        grounded = True
+                        y = p_top[p] - h
+                if grounded:
+                    vy[i] = 0
+            on_ground[i] = grounded
+            left = int(x)
+            right = left + w
+
+            # Collectibles, at their animated height for this tick
+            top = int(y)
+            bottom = top + h
+            gained = 0
+            tick = self.steps[i]
+            for c in range(c_start[i], c_start[i + 1]):
+                if not collected[c] and left < c_right[c] and right > c_left[c]:
+                    period = c_period[c]
+                    index = ((tick % period) * CURVE_SIZE // period + c_offset[c]) & curve_mask
+                    c_top = int(c_base[c] + c_amplitude[c] * c_curve[c][index])
+                    if top < c_top + c_height[c] and bottom > c_top:
+                        collected[c] = 1
+                        gained += 1
+
+            # Enemies patrol, and send the player back on contact
+            for e in range(e_start[i], e_start[i + 1]):
+                low = e_origin[e]
+                high = low + e_patrol[e]
+                enemy_x = ex[e] + e_speed[e] * e_dir[e]
+                if high <= low:
+                    enemy_x = low
+                while enemy_x > high or enemy_x < low:
+                    if enemy_x > high:
+                        enemy_x = 2 * high - enemy_x
+                        e_dir[e] = -1
+                    else:
+                        enemy_x = 2 * low - enemy_x
+                        e_dir[e] = 1
+                ex[e] = enemy_x
+                enemy_left = int(enemy_x)
+                enemy_top = int(ey[e])
+                if (left < enemy_left + e_w[e] and right > enemy_left and
+                        top < enemy_top + e_h[e] and bottom > enemy_top):
+                    x, y = self._respawn_x[i], self._respawn_y[i]
+                    left = int(x)
+                    right = left + w
+                    top = int(y)
+                    bottom = top + h
+
+            px[i], py[i] = x, y
+            self.score[i] += gained
+            self.steps[i] += 1
+            reward = float(gained)
+
+            # Goal
+            if (left < self.goal_right[i] and right > self.goal_left[i] and
+                    top < self.goal_bottom[i] and bottom > self.goal_top[i]):
+                self.goal_reached[i] = True
+                reward += self.goal_reward
+
+            rewards[i] = reward
+            if self.goal_reached[i] or self.steps[i] >= self.max_steps:
+                dones[i] = 1
+                finished_score.append(self.score[i])
+                finished_goal.append(self.goal_reached[i])
+                finished_truncated.append(not self.goal_reached[i])
+
+        info = {"score": finished_score, "goal_reached": finished_goal,
+                "truncated": finished_truncated}
+        if self.autoreset and any(dones):
+            self.reset(i for i in range(n) if dones[i])
+
+        return self.observe(), rewards, dones, info
+
+    def observe(self):
+        """
+        Build the observations of all games
+
+        Returns:
+            array: num_envs * OBSERVATION_SIZE floats, one row per game
+        """
+        obs = array("d", bytes(8 * OBSERVATION_SIZE * self.num_envs))
+        for i in range(self.num_envs):
+            x, y = self.player_x[i], self.player_y[i]
+            nearest_dx = nearest_dy = 0.0
+            nearest = None
+            for e in range(self.enemy_start[i], self.enemy_start[i + 1]):
+                dx = self.enemy_x[e] - x
+                dy = self.enemy_y[e] - y
+                distance = dx * dx + dy * dy
+                if nearest is None or distance < nearest:
+                    nearest, nearest_dx, nearest_dy = distance, dx, dy
+            start, end = self.collectible_start[i], self.collectible_start[i + 1]
+            row = i * OBSERVATION_SIZE
+            obs[row:row + OBSERVATION_SIZE] = array("d", (
+                x, y, self.velocity_x[i], self.velocity_y[i], float(self.on_ground[i]),
+                self.goal_left[i] - x, self.goal_top[i] - y, nearest_dx, nearest_dy,
+                float((end - start) - sum(self.collected[start:end])), float(self.score[i])
+            ))
+        return obs
@@ -1,5 +1,9 @@
 """
 Main application entry point for the AI Game Creator
+
+Each mode imports what it needs when it runs: the AI parser (OpenAI
+client), the game engine (pygame) and the web server (Flask) are not
+loaded at startup, so --help and game processes start quickly.
 """
 import os
 import sys
@@ -10,20 +14,20 @@ import argparse
 project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.append(project_root)
 
-from app.ai_parser.parser import GameDescriptionParser
-from app.game_engine.engine import GameEngine
-from app.web.server import run_server
-
-def run_web_interface():
+def run_web_interface(broker_url=None):
     """Run the web interface"""
+    from app.web.server import run_server
+    
     print("Starting AI Game Creator web interface...")
-    run_server()
+    run_server(broker_url=broker_url)
 
 # Add this to run_game() function in app/main.py
 def run_game(template_name, params_file):
     """
     Run a game with the specified template and parameters
     """
+    from app.game_engine.engine import GameEngine
+    
     try:
         # Load game parameters
         with open(params_file, 'r') as f:
@@ -62,6 +66,9 @@ def run_game(template_name, params_file):
 
 def interactive_mode():
     """Run the game creator in interactive console mode"""
+    from app.ai_parser.parser import GameDescriptionParser
+    from app.game_engine.engine import GameEngine
+    
     parser = GameDescriptionParser()
     
     print("=" * 50)
@@ -90,18 +97,70 @@ def interactive_mode():
     else:
         print("Failed to create game.")
 
+def batch_mode(input_path, output_path=None, workers=None, parse_concurrency=8, ticks=None,
+               snapshot_dir=None, timestep=1):
+    """Generate and validate a batch of games from a JSON-lines file"""
+    from app.batch import run_batch, DEFAULT_VALIDATION_TICKS
+    
+    summary = run_batch(input_path, output_path, workers=workers,
+                        parse_concurrency=parse_concurrency,
+                        ticks=DEFAULT_VALIDATION_TICKS if ticks is None else ticks,
+                        snapshot_dir=snapshot_dir, timestep=timestep)
+    if summary["errors"]:
+        sys.exit(1)
+
+def worker_mode(broker_url=None, node_id=None, capacity=None):
+    """Run games handed out by a shared job broker until interrupted"""
+    from config.settings import BROKER_URL, WORKER_CAPACITY
+    from app.broker import connect_broker, InProcessBroker, Worker
+    
+    broker = connect_broker(broker_url or BROKER_URL)
+    if isinstance(broker, InProcessBroker):
+        print("A worker needs a broker shared with the web server, e.g. --broker redis://host:6379/0")
+        sys.exit(1)
+    
+    worker = Worker(broker, node_id=node_id, capacity=capacity or WORKER_CAPACITY)
+    print(f"Worker {worker.node_id} waiting for games (capacity {worker.capacity})...")
+    try:
+        worker.run()
+    except KeyboardInterrupt:
+        worker.stop()
+        print(f"Worker {worker.node_id} stopped after {worker.completed} games")
+
 def main():
     """Main entry point"""
     parser = argparse.ArgumentParser(description="AI Game Creator")
     parser.add_argument("--web", action="store_true", help="Run the web interface")
     parser.add_argument("--interactive", action="store_true", help="Run in interactive console mode")
+    parser.add_argument("--batch", metavar="INPUT",
+                        help="Generate games from a JSON-lines file of descriptions or params ('-' for stdin)")
+    parser.add_argument("--output", help="JSON-lines file for batch results (default: stdout)")
+    parser.add_argument("--workers", type=int, help="Number of batch build processes (default: CPU count)")
+    parser.add_argument("--parse-concurrency", type=int, default=8,
+                        help="Maximum number of concurrent AI parser calls in batch mode")
+    parser.add_argument("--ticks", type=int, help="Simulation ticks used to validate each batch level")
+    parser.add_argument("--timestep", type=int, default=1,
+                        help="Frames simulated per batch validation update (e.g. 4 for 4x fewer updates)")
+    parser.add_argument("--snapshot-dir", help="Save a binary snapshot of each batch level in this directory")
+    parser.add_argument("--worker", action="store_true",
+                        help="Run games handed out by the job broker (a worker node)")
+    parser.add_argument("--broker", help="Job broker URL for --web and --worker, e.g. redis://host:6379/0")
+    parser.add_argument("--node-id", help="Worker node name (default: host and process id)")
+    parser.add_argument("--capacity", type=int, help="Games a worker node runs at once")
     parser.add_argument("template", nargs="?", help="Game template to use")
     parser.add_argument("params_file", nargs="?", help="Path to game parameters JSON file")
     
     args = parser.parse_args()
+    if args.timestep < 1:
+        parser.error("--timestep must be at least 1")
     
-    if args.web:
-        run_web_interface()
+    if args.batch:
+        batch_mode(args.batch, args.output, args.workers, args.parse_concurrency, args.ticks,
+                   args.snapshot_dir, args.timestep)
+    elif args.worker:
+        worker_mode(args.broker, args.node_id, args.capacity)
+    elif args.web:
+        run_web_interface(args.broker)
     elif args.interactive:
         interactive_mode()
     elif args.template and args.params_file:
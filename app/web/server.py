@@ -1,19 +1,29 @@
 """
 Web server module for the AI Game Creator
 """
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, Response, render_template, request, jsonify
 import os
 import sys
-import subprocess
 import threading
-import json
 
 # Add the project root to the path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 from app.ai_parser.parser import GameDescriptionParser
 
 app = Flask(__name__)
-parser = GameDescriptionParser()
+
+# Created on the first request, see get_parser()
+parser = None
+
+# Streamed game sessions, created on first use, see get_sessions()
+sessions = None
+
+# Job broker that hands games to worker nodes, see get_broker()
+broker = None
+
+# Held while creating the objects above, so concurrent first requests
+# share one of each
+_create_lock = threading.Lock()
 
 # Directory for templates
 template_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates")
@@ -23,6 +33,56 @@ app.template_folder = template_dir
 static_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
 app.static_folder = static_dir
 
+def get_broker():
+    """
+    Return the job broker, connecting on first use
+    
+    The broker URL comes from the app's BROKER_URL config, or the
+    BROKER_URL setting. With the default in-process broker there are no
+    separate worker nodes, so a local worker thread runs the games on this
+    host.
+    """
+    global broker
+    with _create_lock:
+        if broker is None:
+            from config.settings import BROKER_URL
+            from app.broker import connect_broker, InProcessBroker, Worker
+            new_broker = connect_broker(app.config.get("BROKER_URL") or BROKER_URL)
+            if isinstance(new_broker, InProcessBroker):
+                Worker(new_broker, node_id="local").start()
+            broker = new_broker
+        return broker
+
+def launch_game(template_name, game_params):
+    """
+    Queue a game on the least-loaded worker node
+    
+    Args:
+        template_name (str): Name of the template to use
+        game_params (dict): Game parameters
+        
+    Returns:
+        dict: Job record with "id", "node" and "status"
+    """
+    return get_broker().submit(template_name, game_params)
+
+def get_parser():
+    """Return the description parser, creating it on first use"""
+    global parser
+    with _create_lock:
+        if parser is None:
+            parser = GameDescriptionParser()
+        return parser
+
+def get_sessions():
+    """Return the streamed game session manager, creating it on first use"""
+    global sessions
+    with _create_lock:
+        if sessions is None:
+            from app.web.streaming import SessionManager
+            sessions = SessionManager()
+        return sessions
+
 @app.route("/")
 def index():
     """Render the main page"""
@@ -38,37 +98,97 @@ def create_game():
     
     try:
         # Parse the description
-        game_params = parser.parse_description(description)
+        game_parser = get_parser()
+        game_params = game_parser.parse_description(description)
         
         # Determine the appropriate template
-        template_name = parser.get_game_template(game_params)
-        
-        # Save the game parameters to a temporary file
-        params_file = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 
-                                  "game_params.json")
+        template_name = game_parser.get_game_template(game_params)
         
-        with open(params_file, "w") as f:
-            json.dump(game_params, f)
+        # Run the game on the server and stream it to the browser
+        if request.form.get("mode") == "stream":
+            try:
+                session = get_sessions().create(template_name, game_params)
+            except RuntimeError as e:
+                return jsonify({"error": str(e)}), 503
+            return jsonify({
+                "success": True,
+                "message": "Game created! It is running in your browser.",
+                "game_params": game_params,
+                "session_id": session.session_id,
+                "stream_url": f"/sessions/{session.session_id}/stream",
+                "input_url": f"/sessions/{session.session_id}/input"
+            })
         
-        # Start the game in a separate process
-        game_script = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 
-                                  "main.py")
-        
-        # Run the game
-        threading.Thread(target=lambda: subprocess.run(
-            [sys.executable, game_script, template_name, params_file],
-            creationflags=subprocess.CREATE_NEW_CONSOLE if os.name == 'nt' else 0
-        )).start()
+        # Hand the game to a worker node
+        job = launch_game(template_name, game_params)
         
         return jsonify({
             "success": True,
             "message": "Game created! Check the game window.",
-            "game_params": game_params
+            "game_params": game_params,
+            "job_id": job["id"],
+            "node": job["node"],
+            "status_url": f"/jobs/{job['id']}"
         })
         
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@app.route("/sessions/<session_id>/stream")
+def stream_session(session_id):
+    """Stream a game session's frames as MJPEG"""
+    session = get_sessions().get(session_id)
+    if session is None:
+        return jsonify({"error": "Unknown game session"}), 404
+    
+    def multipart():
+        for frame in session.frames():
+            yield (b"--frame\r\nContent-Type: image/jpeg\r\nContent-Length: " +
+                   str(len(frame)).encode() + b"\r\n\r\n" + frame + b"\r\n")
+    
+    return Response(multipart(), mimetype="multipart/x-mixed-replace; boundary=frame",
+                    headers={"Cache-Control": "no-store"})
+
+@app.route("/sessions/<session_id>/input", methods=["POST"])
+def session_input(session_id):
+    """Send a key event from the browser to a game session"""
+    session = get_sessions().get(session_id)
+    if session is None:
+        return jsonify({"error": "Unknown game session"}), 404
+    
+    data = request.get_json(silent=True) or {}
+    if not session.send_input(data.get("type"), data.get("key")):
+        return jsonify({"error": "Unsupported input"}), 400
+    return "", 204
+
+@app.route("/sessions/<session_id>", methods=["GET"])
+def session_stats(session_id):
+    """Report a game session's streaming figures"""
+    session = get_sessions().get(session_id)
+    if session is None:
+        return jsonify({"error": "Unknown game session"}), 404
+    return jsonify(session.stats())
+
+@app.route("/sessions/<session_id>", methods=["DELETE"])
+def close_session(session_id):
+    """End a game session"""
+    if not get_sessions().close(session_id):
+        return jsonify({"error": "Unknown game session"}), 404
+    return "", 204
+
+@app.route("/jobs/<job_id>")
+def job_status(job_id):
+    """Report the status of a launched game"""
+    job = get_broker().status(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown job"}), 404
+    return jsonify(job)
+
+@app.route("/nodes")
+def worker_nodes():
+    """List the live worker nodes and their load"""
+    return jsonify(get_broker().nodes())
+
 def create_template_dirs():
     """Create the template and static directories if they don't exist"""
     os.makedirs(template_dir, exist_ok=True)
@@ -112,8 +232,18 @@ def create_template_dirs():
 </html>
             """)
 
-def run_server(host='127.0.0.1', port=5000, debug=True):
-    """Run the web server"""
+def run_server(host='127.0.0.1', port=5000, debug=True, broker_url=None):
+    """
+    Run the web server
+    
+    Args:
+        host (str): Interface to listen on
+        port (int): Port to listen on
+        debug (bool): Run Flask in debug mode
+        broker_url (str): Job broker URL, the BROKER_URL setting if omitted
+    """
+    if broker_url:
+        app.config["BROKER_URL"] = broker_url
     create_template_dirs()
     app.run(host=host, port=port, debug=debug)
 
@@ -5,6 +5,12 @@ document.addEventListener('DOMContentLoaded', function() {
     const errorDiv = document.getElementById('error');
     const errorMessage = document.getElementById('error-message');
     const gameParamsDisplay = document.getElementById('game-params');
+    const playInBrowser = document.getElementById('play-in-browser');
+    const streamDiv = document.getElementById('game-stream');
+    const gameFrame = document.getElementById('game-frame');
+    const stopButton = document.getElementById('stop-game');
+    const streamedKeys = ['ArrowLeft', 'ArrowRight', 'ArrowUp', 'ArrowDown', ' '];
+    let session = null;
     
     form.addEventListener('submit', function(e) {
         e.preventDefault();
@@ -23,10 +29,14 @@ document.addEventListener('DOMContentLoaded', function() {
         // Hide previous results
         resultDiv.classList.add('hidden');
         errorDiv.classList.add('hidden');
+        stopStream();
         
         // Submit the request
         const formData = new FormData();
         formData.append('description', description);
+        if (playInBrowser.checked) {
+            formData.append('mode', 'stream');
+        }
         
         fetch('/create_game', {
             method: 'POST',
@@ -38,6 +48,9 @@ document.addEventListener('DOMContentLoaded', function() {
                 showError(data.error);
             } else {
                 showResult(data);
+                if (data.session_id) {
+                    startStream(data);
+                }
             }
         })
         .catch(error => {
@@ -56,6 +69,51 @@ document.addEventListener('DOMContentLoaded', function() {
         errorDiv.classList.add('hidden');
     }
     
+    function startStream(data) {
+        session = data;
+        gameFrame.src = data.stream_url;
+        streamDiv.classList.remove('hidden');
+        gameFrame.focus();
+    }
+    
+    function stopStream() {
+        if (!session) {
+            return;
+        }
+        fetch('/sessions/' + session.session_id, { method: 'DELETE' });
+        gameFrame.removeAttribute('src');
+        streamDiv.classList.add('hidden');
+        session = null;
+    }
+    
+    function sendKey(e, type) {
+        if (!session || !streamedKeys.includes(e.key)) {
+            return;
+        }
+        e.preventDefault();
+        if (type === 'keydown' && e.repeat) {
+            return;
+        }
+        fetch(session.input_url, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ type: type, key: e.key })
+        });
+    }
+    
+    document.addEventListener('keydown', function(e) {
+        if (e.target !== descriptionInput) {
+            sendKey(e, 'keydown');
+        }
+    });
+    document.addEventListener('keyup', function(e) {
+        if (e.target !== descriptionInput) {
+            sendKey(e, 'keyup');
+        }
+    });
+    stopButton.addEventListener('click', stopStream);
+    window.addEventListener('beforeunload', stopStream);
+    
     function showError(message) {
         errorMessage.textContent = message;
         errorDiv.classList.remove('hidden');
@@ -0,0 +1,337 @@
+"""
+Server-side game sessions streamed to the browser
+
+Each GameSession runs a headless GameEngine in its own thread, renders to an
+offscreen surface and publishes JPEG frames that the web server streams as
+MJPEG (multipart/x-mixed-replace). Key presses come back from the browser
+through send_input().
+
+To stay within a CPU budget per session, frames are only rendered while
+someone is watching, identical frames are not re-encoded, and the frame
+rate (then the resolution) is lowered when a session uses more than its
+share of a core and raised again when it has room.
+
+All sessions run in the web server process and share its GIL, so together
+they use at most one core however many the host has. STREAM_MAX_SESSIONS
+and STREAM_CPU_BUDGET split that one core between them, and each
+session's load is its thread's own CPU time, not counting the time spent
+waiting for the GIL.
+"""
+import io
+import os
+import sys
+import time
+import uuid
+import threading
+
+import pygame
+
+# Add the project root to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from config.settings import (FPS, STREAM_MAX_SESSIONS, STREAM_MAX_FPS, STREAM_MIN_FPS,
+                             STREAM_CPU_BUDGET, STREAM_IDLE_TIMEOUT)
+from app.game_engine.engine import GameEngine
+
+# Browser KeyboardEvent.key values and the pygame keys they stand for
+BROWSER_KEYS = {
+    "ArrowLeft": pygame.K_LEFT,
+    "ArrowRight": pygame.K_RIGHT,
+    "ArrowUp": pygame.K_UP,
+    "ArrowDown": pygame.K_DOWN,
+    " ": pygame.K_SPACE,
+    "Spacebar": pygame.K_SPACE
+}
+
+# Resolution steps used once the frame rate is at its minimum
+SCALES = (1.0, 0.75, 0.5)
+
+# How often the session measures its load and adapts, in seconds
+ADAPT_INTERVAL = 1.0
+
+def encode_frame(surface, scale=1.0):
+    """
+    Encode a frame for streaming
+
+    Args:
+        surface (pygame.Surface): Rendered frame
+        scale (float): Resolution factor to apply before encoding
+
+    Returns:
+        bytes: JPEG data
+    """
+    if scale != 1.0:
+        width, height = surface.get_size()
+        surface = pygame.transform.smoothscale(surface, (int(width * scale), int(height * scale)))
+    data = io.BytesIO()
+    pygame.image.save(surface, data, "frame.jpg")
+    return data.getvalue()
+
+class GameSession:
+    """A headless game whose frames are streamed to browser viewers"""
+
+    def __init__(self, session_id, template_name, game_params, max_fps=STREAM_MAX_FPS,
+                 min_fps=STREAM_MIN_FPS, cpu_budget=STREAM_CPU_BUDGET,
+                 idle_timeout=STREAM_IDLE_TIMEOUT):
+        """
+        Create the game and start its thread
+
+        Args:
+            session_id (str): Identifier used in the session URLs
+            template_name (str): Name of the template to use
+            game_params (dict): Game parameters
+            max_fps (float): Highest frame rate sent to viewers
+            min_fps (float): Lowest frame rate before the resolution drops
+            cpu_budget (float): Share of the server's core the session may use
+            idle_timeout (float): Seconds without viewers or input before the
+                session ends on its own
+        """
+        self.session_id = session_id
+        self.max_fps = max_fps
+        self.min_fps = min_fps
+        self.cpu_budget = cpu_budget
+        self.idle_timeout = idle_timeout
+
+        self.engine = GameEngine(headless=True)
+        if not self.engine.create_game(template_name, game_params):
+            raise ValueError(f"Could not create a game from template '{template_name}'")
+
+        self.fps = max_fps
+        self.scale_index = 0
+        self.load = 0.0
+        self.frames_encoded = 0
+        self.frames_skipped = 0
+
+        self._lock = threading.Lock()
+        self._new_frame = threading.Condition(self._lock)
+        self._held_keys = set()
+        self._pending_events = []
+        self._viewers = 0
+        self._force_frame = True
+        self._last_activity = time.monotonic()
+        self.frame = None
+        self.frame_id = 0
+        self.closed = False
+
+        self._thread = threading.Thread(target=self._run, name=f"game-session-{session_id}",
+                                        daemon=True)
+        self._thread.start()
+
+    @property
+    def scale(self):
+        return SCALES[self.scale_index]
+
+    def send_input(self, kind, key_name):
+        """
+        Apply a key event from the browser
+
+        Args:
+            kind (str): "keydown" or "keyup"
+            key_name (str): Browser KeyboardEvent.key value
+
+        Returns:
+            bool: Whether the key and event type were recognised
+        """
+        key = BROWSER_KEYS.get(key_name)
+        if key is None or kind not in ("keydown", "keyup"):
+            return False
+        with self._lock:
+            self._last_activity = time.monotonic()
+            if kind == "keydown":
+                if key not in self._held_keys:
+                    self._pending_events.append(pygame.event.Event(pygame.KEYDOWN, key=key))
+                self._held_keys.add(key)
+            else:
+                self._pending_events.append(pygame.event.Event(pygame.KEYUP, key=key))
+                self._held_keys.discard(key)
+        return True
+
+    def frames(self):
+        """
+        Yield each new encoded frame while the session runs
+
+        Yields:
+            bytes: JPEG data
+        """
+        with self._lock:
+            self._viewers += 1
+            self._force_frame = True
+        try:
+            last_id = 0
+            while True:
+                with self._new_frame:
+                    self._new_frame.wait_for(lambda: self.closed or self.frame_id != last_id,
+                                             timeout=1.0)
+                    if self.closed:
+                        return
+                    if self.frame_id == last_id:
+                        continue
+                    frame, last_id = self.frame, self.frame_id
+                yield frame
+        finally:
+            with self._lock:
+                self._viewers -= 1
+                self._last_activity = time.monotonic()
+
+    def stats(self):
+        """Return the session's current streaming figures"""
+        with self._lock:
+            viewers = self._viewers
+        return {
+            "session_id": self.session_id,
+            "fps": round(self.fps, 1),
+            "scale": self.scale,
+            "load": round(self.load, 3),
+            "cpu_budget": self.cpu_budget,
+            "viewers": viewers,
+            "frames_encoded": self.frames_encoded,
+            "frames_skipped": self.frames_skipped,
+            "ticks": self.engine.ticks,
+            "closed": self.closed
+        }
+
+    def close(self):
+        """Stop the session and wake up its viewers"""
+        with self._new_frame:
+            self.closed = True
+            self._new_frame.notify_all()
+
+    def _adapt(self):
+        """Trade frame rate, then resolution, against the CPU budget"""
+        if self.load > self.cpu_budget:
+            if self.fps > self.min_fps:
+                self.fps = max(self.min_fps, self.fps * 0.75)
+            elif self.scale_index < len(SCALES) - 1:
+                self.scale_index += 1
+        elif self.load < self.cpu_budget * 0.5:
+            if self.scale_index > 0:
+                self.scale_index -= 1
+            elif self.fps < self.max_fps:
+                self.fps = min(self.max_fps, self.fps * 1.25)
+
+    def _run(self):
+        """Simulate at the game's tick rate and publish frames for viewers"""
+        tick_interval = 1.0 / FPS
+        next_tick = time.perf_counter()
+        next_frame = next_tick
+        window_start = next_tick
+        window_cpu = time.thread_time()
+        last_raw = None
+
+        try:
+            while not self.closed:
+                start = time.perf_counter()
+                with self._lock:
+                    events, self._pending_events = self._pending_events, []
+                    keys = tuple(self._held_keys)
+                    watched = self._viewers > 0
+                    idle = time.monotonic() - self._last_activity
+                    if self._force_frame:
+                        last_raw = None
+                        self._force_frame = False
+
+                if not watched and idle > self.idle_timeout:
+                    break
+
+                render = watched and start >= next_frame
+                self.engine.step(keys=keys, events=events, render=render)
+
+                if render:
+                    next_frame = start + 1.0 / self.fps
+                    raw = self.engine.screen.get_buffer().raw
+                    if raw == last_raw:
+                        self.frames_skipped += 1
+                    else:
+                        last_raw = raw
+                        frame = encode_frame(self.engine.screen, self.scale)
+                        self.frames_encoded += 1
+                        with self._new_frame:
+                            self.frame = frame
+                            self.frame_id += 1
+                            self._new_frame.notify_all()
+
+                now = time.perf_counter()
+                if now - window_start >= ADAPT_INTERVAL:
+                    cpu = time.thread_time()
+                    self.load = (cpu - window_cpu) / (now - window_start)
+                    self._adapt()
+                    window_start = now
+                    window_cpu = cpu
+
+                next_tick += tick_interval
+                delay = next_tick - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                else:
+                    # Running behind: don't try to catch up with a burst of ticks
+                    next_tick = time.perf_counter()
+        finally:
+            self.close()
+
+# TODO: run sessions in worker processes (e.g. one pool process per core,
+# passing input in and JPEG frames out) so a host can stream many more
+# concurrent players than the one core the server process's GIL allows;
+# STREAM_MAX_SESSIONS and STREAM_CPU_BUDGET would then be per process.
+class SessionManager:
+    """Creates, finds and ends the streamed game sessions of a server"""
+
+    def __init__(self, max_sessions=STREAM_MAX_SESSIONS, **session_options):
+        """
+        Initialize the manager
+
+        Args:
+            max_sessions (int): Maximum number of concurrent sessions
+            **session_options: Passed on to every GameSession
+        """
+        self.max_sessions = max_sessions
+        self.session_options = session_options
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def _prune(self):
+        for session_id in [i for i, s in self._sessions.items() if s.closed]:
+            del self._sessions[session_id]
+
+    def create(self, template_name, game_params):
+        """
+        Start a new streamed game
+
+        Args:
+            template_name (str): Name of the template to use
+            game_params (dict): Game parameters
+
+        Returns:
+            GameSession: The running session
+        """
+        with self._lock:
+            self._prune()
+            if len(self._sessions) >= self.max_sessions:
+                raise RuntimeError("Too many games are being streamed, try again later")
+            session_id = uuid.uuid4().hex
+            session = GameSession(session_id, template_name, game_params, **self.session_options)
+            self._sessions[session_id] = session
+            return session
+
+    def get(self, session_id):
+        """Return a running session, or None"""
+        with self._lock:
+            self._prune()
+            return self._sessions.get(session_id)
+
+    def close(self, session_id):
+        """
+        End a session
+
+        Returns:
+            bool: Whether the session existed
+        """
+        with self._lock:
+            session = self._sessions.pop(session_id, None)
+        if session is None:
+            return False
+        session.close()
+        return True
+
+    def __len__(self):
+        with self._lock:
+            self._prune()
+            return len(self._sessions)
@@ -0,0 +1,680 @@
+"""
+Benchmark suite for the AI Game Creator
+
+Runs offline and headless: pygame uses the dummy video driver and the AI
+parser talks to a stubbed LLM client instead of the OpenAI API.
+
+Usage:
+    python benchmarks/run_benchmarks.py --output results.json
+    python benchmarks/run_benchmarks.py --baseline results.json --tolerance 0.2
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import statistics
+import contextlib
+import io
+
+# Run without a display, sound card or API key
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+os.environ.setdefault("OPENAI_API_KEY", "offline-benchmark")
+
+# Add the project root to the path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from stub_llm import StubLLMClient
+
+GAME_PARAMS = {
+    "game_type": "platformer",
+    "player_character": "A frog",
+    "environment": "A swamp",
+    "goal": "Collect flies and avoid alligators",
+    "obstacles": ["alligators", "snakes", "herons"],
+    "mechanics": ["jumping"]
+}
+
+# Registered benchmarks, in the order they are run
+BENCHMARKS = {}
+
+def benchmark(name):
+    """Register a benchmark function under the given name"""
+    def register(func):
+        BENCHMARKS[name] = func
+        return func
+    return register
+
+def result(name, value, unit, higher_is_better=True, budget=None):
+    """
+    Build a single benchmark measurement
+
+    A budget is a hard limit (a maximum when lower is better, a minimum
+    otherwise); measurements outside their budget fail the run.
+    """
+    measurement = {
+        "name": name,
+        "value": value,
+        "unit": unit,
+        "higher_is_better": higher_is_better
+    }
+    if budget is not None:
+        measurement["budget"] = budget
+    return measurement
+
+def over_budget(measurement):
+    """Whether a measurement is outside its budget"""
+    budget = measurement.get("budget")
+    if budget is None:
+        return False
+    if measurement["higher_is_better"]:
+        return measurement["value"] < budget
+    return measurement["value"] > budget
+
+def time_per_call(func, number, repeat=5):
+    """
+    Time a function call
+
+    Args:
+        func (callable): Function to time, called without arguments
+        number (int): Calls per timing run
+        repeat (int): Number of timing runs
+
+    Returns:
+        float: Best observed seconds per call
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - start
+        best = min(best, elapsed / number)
+    return best
+
+def quiet():
+    """Silence the progress prints of the code under benchmark"""
+    return contextlib.redirect_stdout(io.StringIO())
+
+_engine = None
+
+def get_engine():
+    """Create the (headless) game engine once and reuse it"""
+    global _engine
+    if _engine is None:
+        from app.game_engine.engine import GameEngine
+        _engine = GameEngine()
+    return _engine
+
+# Startup budgets, in milliseconds of wall time for a fresh interpreter
+HELP_BUDGET_MS = 300
+IMPORT_MAIN_BUDGET_MS = 50
+
+# Modules that only specific modes need and that must not load at startup
+HEAVY_MODULES = ("pygame", "flask", "openai", "dotenv")
+
+def _run_python(code):
+    """Run Python code in a fresh interpreter from the project root"""
+    import subprocess
+    env = dict(os.environ)
+    env.pop("OPENAI_API_KEY", None)
+    completed = subprocess.run([sys.executable, "-c", code], cwd=project_root, env=env,
+                               capture_output=True, text=True, check=True)
+    return completed.stdout
+
+@benchmark("startup")
+def bench_startup(quick=False):
+    """CLI startup time and the modules loaded by importing app.main"""
+    import subprocess
+
+    runs = 3 if quick else 7
+
+    def help_ms():
+        start = time.perf_counter()
+        subprocess.run([sys.executable, os.path.join(project_root, "app", "main.py"), "--help"],
+                       capture_output=True, check=True)
+        return (time.perf_counter() - start) * 1000
+
+    def baseline_ms():
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", "pass"], capture_output=True, check=True)
+        return (time.perf_counter() - start) * 1000
+
+    probe = (
+        "import sys, time, json\n"
+        "start = time.perf_counter()\n"
+        "import app.main\n"
+        "elapsed = time.perf_counter() - start\n"
+        f"heavy = [m for m in {HEAVY_MODULES!r} if m in sys.modules]\n"
+        "print(json.dumps({'ms': elapsed * 1000, 'heavy': heavy}))\n"
+    )
+    imports = [json.loads(_run_python(probe)) for _ in range(runs)]
+    # What a template game process pays on top, for the engine and pygame
+    engine_probe = probe.replace("import app.main", "import app.main, app.game_engine.engine")
+    engine_imports = [json.loads(_run_python(engine_probe)) for _ in range(runs)]
+
+    return [
+        result("startup.python_ms", statistics.median(baseline_ms() for _ in range(runs)), "ms",
+               higher_is_better=False),
+        result("startup.main_help_ms", statistics.median(help_ms() for _ in range(runs)), "ms",
+               higher_is_better=False, budget=HELP_BUDGET_MS),
+        result("startup.import_main_ms", statistics.median(i["ms"] for i in imports), "ms",
+               higher_is_better=False, budget=IMPORT_MAIN_BUDGET_MS),
+        result("startup.heavy_modules_at_import", float(len(imports[0]["heavy"])), "modules",
+               higher_is_better=False, budget=0),
+        result("startup.import_game_process_ms", statistics.median(i["ms"] for i in engine_imports),
+               "ms", higher_is_better=False)
+    ]
+
+@benchmark("engine")
+def bench_engine(quick=False):
+    """Engine ticks per second for growing entity counts"""
+    from app.game_engine.templates.platformer import Enemy
+
+    engine = get_engine()
+    results = []
+    for extra in ([0, 100] if quick else [0, 100, 1000]):
+        with quiet():
+            engine.create_game("platformer", GAME_PARAMS)
+        engine.game_objects.extend(
+            Enemy(random.randint(0, 760), random.randint(0, 560), 20, 20, random.randint(50, 150))
+            for _ in range(extra)
+        )
+        ticks = 50 if quick else 200
+        seconds = time_per_call(engine.step, ticks)
+        results.append(result(f"engine.ticks_per_sec[entities={len(engine.game_objects)}]",
+                              1.0 / seconds, "ticks/s"))
+    return results
+
+@benchmark("input")
+def bench_input(quick=False):
+    """Cost of dispatching one event to a game with many objects"""
+    import pygame
+    from app.game_engine.templates.platformer import Enemy
+
+    engine = get_engine()
+    with quiet():
+        engine.create_game("platformer", GAME_PARAMS)
+    engine.game_objects.extend(Enemy(random.randint(0, 760), random.randint(0, 560), 20, 20)
+                               for _ in range(1000))
+    engine.bind_input()
+    events = [
+        pygame.event.Event(pygame.MOUSEMOTION, pos=(10, 10), rel=(1, 1), buttons=(0, 0, 0)),
+        pygame.event.Event(pygame.KEYDOWN, key=pygame.K_a),
+        pygame.event.Event(pygame.KEYUP, key=pygame.K_a)
+    ]
+
+    def broadcast():
+        # What the engine did before input routing: every event to every object
+        for event in events:
+            for obj in engine.game_objects:
+                if hasattr(obj, 'handle_event'):
+                    obj.handle_event(event)
+
+    def routed():
+        for event in events:
+            engine.input.dispatch(event)
+
+    number = 20 if quick else 200
+    label = f"objects={len(engine.game_objects)}"
+    return [
+        result(f"input.broadcast_us_per_event[{label}]",
+               time_per_call(broadcast, number) / len(events) * 1e6, "us", higher_is_better=False),
+        result(f"input.routed_us_per_event[{label}]",
+               time_per_call(routed, number * 10) / len(events) * 1e6, "us", higher_is_better=False)
+    ]
+
+@benchmark("template")
+def bench_template(quick=False):
+    """Time to build the platformer game objects for each level layout"""
+    from app.game_engine.templates.platformer import create_game_objects
+    from config.settings import ASSETS_DIR
+
+    get_engine()  # pygame must be initialised for the game objects
+    results = []
+    for environment in ("swamp", "mountain", "cave"):
+        params = dict(GAME_PARAMS, environment=environment)
+        seconds = time_per_call(lambda: create_game_objects(params, ASSETS_DIR),
+                                200 if quick else 2000)
+        results.append(result(f"template.platformer.build_us[{environment}]",
+                              seconds * 1e6, "us", higher_is_better=False))
+    return results
+
+@benchmark("objects")
+def bench_objects(quick=False):
+    """Per-instance memory and per-tick update/draw cost of game objects"""
+    import gc
+    import tracemalloc
+    import pygame
+    from app.game_engine.engine import GameObject, Player
+    from app.game_engine.templates.platformer import Collectible, Enemy
+
+    surface = get_engine().screen
+    count = 2000 if quick else 20000
+    results = []
+    for cls, make in (
+        (GameObject, lambda i: GameObject(i % 780, i % 580, 20, 20)),
+        (Player, lambda i: Player(i % 780, i % 580, 50, 50)),
+        (Collectible, lambda i: Collectible(i % 780, i % 580)),
+        (Enemy, lambda i: Enemy(i % 700, i % 560, 20, 20))
+    ):
+        gc.collect()
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        objects = [make(i) for i in range(count)]
+        size = tracemalloc.get_traced_memory()[0] - before
+        tracemalloc.stop()
+
+        def update_all():
+            for obj in objects:
+                obj.update()
+
+        def draw_all():
+            for obj in objects:
+                obj.draw(surface)
+
+        update_seconds = time_per_call(update_all, 3 if quick else 10) / count
+        draw_seconds = time_per_call(draw_all, 2 if quick else 5) / count
+        name = cls.__name__
+        results.append(result(f"objects.bytes_per_instance[{name}]", size / count, "B",
+                              higher_is_better=False))
+        results.append(result(f"objects.update_ns[{name}]", update_seconds * 1e9, "ns",
+                              higher_is_better=False))
+        results.append(result(f"objects.draw_ns[{name}]", draw_seconds * 1e9, "ns",
+                              higher_is_better=False))
+    return results
+
+@benchmark("animation")
+def bench_animation(quick=False):
+    """Per-object cost of the batched animation pass against the old wall-clock bob"""
+    import math
+    import pygame
+    from app.game_engine.animation import Animator
+    from app.game_engine.templates.platformer import Collectible
+
+    get_engine()
+    count = 2000 if quick else 20000
+    number = 5 if quick else 20
+    collectibles = [Collectible(i % 780, i % 580) for i in range(count)]
+    animator = Animator()
+    for collectible in collectibles:
+        collectible.bind_animation(animator)
+
+    tick = iter(range(10 ** 9))
+    batch_seconds = time_per_call(lambda: animator.update(next(tick)), number) / count
+
+    # What Collectible.update() used to do every tick, as a reference
+    def wall_clock_all():
+        for collectible in collectibles:
+            collectible.y += math.sin(pygame.time.get_ticks() * 0.005) * 0.5
+
+    wall_clock_seconds = time_per_call(wall_clock_all, number) / count
+    return [
+        result("animation.update_ns[batch]", batch_seconds * 1e9, "ns", higher_is_better=False),
+        result("animation.update_ns[wall_clock]", wall_clock_seconds * 1e9, "ns",
+               higher_is_better=False)
+    ]
+
+@benchmark("render")
+def bench_render(quick=False):
+    """Frame cost with a baked level layer against redrawing every platform"""
+    from app.game_engine.engine import GameEngine
+    from app.game_engine.templates.platformer import Platform
+
+    engine = GameEngine(headless=True)
+    number = 20 if quick else 100
+    results = []
+    for extra in ([0, 1000] if quick else [0, 100, 1000]):
+        with quiet():
+            engine.create_game("platformer", GAME_PARAMS)
+        manager = next(obj for obj in engine.game_objects if hasattr(obj, "layers"))
+        platforms = [Platform(random.randint(0, 760), random.randint(0, 560), 40, 10)
+                     for _ in range(extra)]
+        manager.platforms.extend(platforms)
+        engine.game_objects = engine.game_objects + platforms
+
+        def redraw():
+            engine.screen.fill((0, 0, 0))
+            manager.draw(engine.screen)
+
+        count = len(manager.platforms)
+        render_seconds = time_per_call(engine.render, number)
+        redraw_seconds = time_per_call(redraw, number)
+        results.append(result(f"render.frame_ms[baked,platforms={count}]", render_seconds * 1000,
+                              "ms", higher_is_better=False))
+        results.append(result(f"render.frame_ms[redraw,platforms={count}]", redraw_seconds * 1000,
+                              "ms", higher_is_better=False))
+
+    # A level twice the screen's width, with the camera scrolling across it
+    with quiet():
+        engine.create_game("platformer", GAME_PARAMS)
+    manager = next(obj for obj in engine.game_objects if hasattr(obj, "layers"))
+    width, height = engine.screen.get_size()
+    platforms = [Platform(random.randint(0, 2 * width - 40), random.randint(0, height - 40), 40, 10)
+                 for _ in range(1000)]
+    manager.platforms.extend(platforms)
+    engine.game_objects = engine.game_objects + platforms
+    frame = iter(range(10 ** 9))
+
+    def scroll():
+        engine.camera = (next(frame) * 4 % width, 0)
+        engine.render()
+
+    results.append(result(f"render.frame_ms[scrolled,platforms={len(manager.platforms)}]",
+                          time_per_call(scroll, number) * 1000, "ms", higher_is_better=False))
+    engine.camera = (0, 0)
+    return results
+
+@benchmark("collision")
+def bench_collision(quick=False):
+    """Swept collision queries and level validation cost at larger timesteps"""
+    from app.batch import build_and_validate
+    from app.game_engine.collision import Broadphase, move_and_collide
+    from app.game_engine.templates.platformer import Platform
+
+    get_engine()
+    results = []
+    rng = random.Random(0)
+    for count in ([10, 1000] if quick else [10, 100, 1000]):
+        platforms = [Platform(rng.randint(0, 760), rng.randint(0, 580), 40, 10) for _ in range(count)]
+        broadphase = Broadphase(platforms)
+        seconds = time_per_call(
+            lambda: move_and_collide(rng.uniform(0, 750), rng.uniform(0, 500), 50, 50,
+                                     0, rng.uniform(0, 60), broadphase, one_way=True),
+            500 if quick else 5000)
+        results.append(result(f"collision.sweep_us[platforms={count}]", seconds * 1e6, "us",
+                              higher_is_better=False))
+
+    for timestep in (1, 4, 8):
+        seconds = time_per_call(
+            lambda: build_and_validate("platformer", GAME_PARAMS, 0, 300, timestep=timestep),
+            2 if quick else 10)
+        results.append(result(f"collision.validate_ms[timestep={timestep}]", seconds * 1000, "ms",
+                              higher_is_better=False))
+    return results
+
+@benchmark("stream")
+def bench_stream(quick=False):
+    """Per-frame cost of a streamed session and the sessions one core can serve"""
+    from app.game_engine.engine import GameEngine
+    from app.web.streaming import encode_frame
+    from config.settings import FPS, STREAM_MAX_FPS
+
+    engine = GameEngine(headless=True)
+    with quiet():
+        engine.create_game("platformer", GAME_PARAMS)
+    number = 20 if quick else 200
+
+    tick_seconds = time_per_call(lambda: engine.step(render=False), number * 5)
+    render_seconds = time_per_call(engine.render, number)
+    compare_seconds = time_per_call(lambda: engine.screen.get_buffer().raw == b"", number)
+    encode_seconds = time_per_call(lambda: encode_frame(engine.screen), number)
+
+    frame_seconds = render_seconds + compare_seconds + encode_seconds
+    core_share = tick_seconds * FPS + frame_seconds * STREAM_MAX_FPS
+    return [
+        result("stream.tick_ms", tick_seconds * 1000, "ms", higher_is_better=False),
+        result("stream.frame_ms", frame_seconds * 1000, "ms", higher_is_better=False),
+        result("stream.encode_ms", encode_seconds * 1000, "ms", higher_is_better=False),
+        # All sessions share the server's one core; compare with STREAM_MAX_SESSIONS
+        result(f"stream.sessions_per_core[fps={STREAM_MAX_FPS}]", 1.0 / core_share, "sessions")
+    ]
+
+@benchmark("vector_env")
+def bench_vector_env(quick=False):
+    """Environment steps per second of the vectorized platformer environment"""
+    from app.game_engine.vector_env import VectorPlatformerEnv, NUM_ACTIONS
+
+    get_engine()
+    results = []
+    for num_envs in ([16, 256] if quick else [16, 256, 2048]):
+        env = VectorPlatformerEnv.from_params(GAME_PARAMS, num_envs, max_steps=500)
+        rng = random.Random(0)
+        actions = [[rng.randrange(NUM_ACTIONS) for _ in range(num_envs)] for _ in range(16)]
+        step = iter(range(10 ** 9))
+        seconds = time_per_call(lambda: env.step(actions[next(step) % 16]), 20 if quick else 50)
+        results.append(result(f"vector_env.env_steps_per_sec[envs={num_envs}]",
+                              num_envs / seconds, "steps/s"))
+    return results
+
+@benchmark("snapshot")
+def bench_snapshot(quick=False):
+    """Snapshot save/load time for a large level versus regenerating it"""
+    import tempfile
+    from app.game_engine.templates.platformer import create_game_objects, Collectible, Enemy
+    from app.game_engine.snapshot import pack_snapshot, write_snapshot, open_snapshot
+    from config.settings import ASSETS_DIR
+
+    get_engine()
+    game_objects = create_game_objects(GAME_PARAMS, ASSETS_DIR)
+    game_objects.extend(Collectible(random.randint(0, 780), random.randint(0, 580))
+                        for _ in range(5000 if quick else 50000))
+    game_objects.extend(Enemy(random.randint(0, 700), random.randint(0, 560), 20, 20)
+                        for _ in range(1000 if quick else 10000))
+    label = f"entities={len(game_objects)}"
+    number = 2 if quick else 5
+
+    def regenerate():
+        create_game_objects(GAME_PARAMS, ASSETS_DIR)
+        [Collectible(random.randint(0, 780), random.randint(0, 580))
+         for _ in range(5000 if quick else 50000)]
+        [Enemy(random.randint(0, 700), random.randint(0, 560), 20, 20)
+         for _ in range(1000 if quick else 10000)]
+
+    def open_only():
+        with open_snapshot(path) as snapshot:
+            snapshot.x[len(snapshot) - 1]
+
+    def load():
+        with open_snapshot(path) as snapshot:
+            snapshot.build_game_objects()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "level.agcs")
+        save_seconds = time_per_call(lambda: write_snapshot(path, game_objects, "platformer", GAME_PARAMS),
+                                     number)
+        open_seconds = time_per_call(open_only, number * 20)
+        load_seconds = time_per_call(load, number)
+        size = len(pack_snapshot(game_objects))
+    regenerate_seconds = time_per_call(regenerate, number)
+
+    return [
+        result(f"snapshot.save_ms[{label}]", save_seconds * 1000, "ms", higher_is_better=False),
+        result(f"snapshot.open_mmap_ms[{label}]", open_seconds * 1000, "ms", higher_is_better=False),
+        result(f"snapshot.load_objects_ms[{label}]", load_seconds * 1000, "ms", higher_is_better=False),
+        result(f"snapshot.regenerate_ms[{label}]", regenerate_seconds * 1000, "ms",
+               higher_is_better=False),
+        # Loading a snapshot must beat building the level again
+        result(f"snapshot.load_vs_regenerate[{label}]", load_seconds / regenerate_seconds, "x",
+               higher_is_better=False, budget=1.0),
+        result(f"snapshot.bytes_per_entity[{label}]", size / len(game_objects), "B",
+               higher_is_better=False)
+    ]
+
+@benchmark("parser")
+def bench_parser(quick=False, llm_latency=0.0):
+    """Latency and throughput of parse_description against a stubbed LLM"""
+    from app.ai_parser.parser import GameDescriptionParser
+
+    parser = GameDescriptionParser(client=StubLLMClient(GAME_PARAMS, latency=llm_latency))
+    description = "A platformer game where a frog jumps through a swamp to collect flies and avoid alligators."
+    calls = 200 if quick else 2000
+
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(calls):
+        call_start = time.perf_counter()
+        parser.parse_description(description)
+        latencies.append(time.perf_counter() - call_start)
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return [
+        result("parser.latency_p50_us", statistics.median(latencies) * 1e6, "us", higher_is_better=False),
+        result("parser.latency_p95_us", latencies[int(len(latencies) * 0.95) - 1] * 1e6, "us",
+               higher_is_better=False),
+        result("parser.throughput", calls / elapsed, "calls/s")
+    ]
+
+@benchmark("server")
+def bench_server(quick=False, llm_latency=0.0):
+    """Requests per second of /create_game through the Flask test client"""
+    from app.ai_parser.parser import GameDescriptionParser
+    from app.broker import InProcessBroker
+    from app.web import server
+
+    server.parser = GameDescriptionParser(client=StubLLMClient(GAME_PARAMS, latency=llm_latency))
+    # Jobs are queued but, with no worker nodes, never run
+    server.broker = InProcessBroker()
+    client = server.app.test_client()
+    description = {"description": "A platformer game in a cave full of bats."}
+
+    def post():
+        response = client.post("/create_game", data=description)
+        if response.status_code != 200:
+            raise RuntimeError(f"/create_game returned {response.status_code}: {response.data!r}")
+
+    seconds = time_per_call(post, 100 if quick else 1000)
+    return [result("server.create_game.requests_per_sec", 1.0 / seconds, "req/s")]
+
+@benchmark("broker")
+def bench_broker(quick=False):
+    """Job round trips per second through the brokers, routed across worker nodes"""
+    from app.broker import connect_broker
+
+    results = []
+    number = 100 if quick else 1000
+    for url in ("memory://", "local://"):
+        broker = connect_broker(url)
+        node_ids = [f"node-{i}" for i in range(8)]
+        for node_id in node_ids:
+            broker.heartbeat(node_id, capacity=4, running=0)
+        submitted = iter(range(10 ** 9))
+
+        def round_trip():
+            job = broker.submit("platformer", GAME_PARAMS)
+            fetched = broker.fetch(job["node"], timeout=1.0)
+            broker.report(fetched["id"], "finished", returncode=0)
+            if next(submitted) % 100 == 0:
+                for node_id in node_ids:
+                    broker.heartbeat(node_id, capacity=4, running=0)
+
+        seconds = time_per_call(round_trip, number)
+        scheme = url.split(":")[0]
+        results.append(result(f"broker.jobs_per_sec[{scheme},nodes={len(node_ids)}]",
+                              1.0 / seconds, "jobs/s"))
+    return results
+
+def run(names=None, quick=False, llm_latency=0.0):
+    """
+    Run the selected benchmarks
+
+    Args:
+        names (list): Benchmark names to run, all when empty
+        quick (bool): Use fewer iterations
+        llm_latency (float): Simulated LLM round trip in seconds
+
+    Returns:
+        dict: Machine-readable benchmark report
+    """
+    measurements = []
+    for name, func in BENCHMARKS.items():
+        if names and name not in names:
+            continue
+        random.seed(0)
+        kwargs = {"quick": quick}
+        if "llm_latency" in func.__code__.co_varnames:
+            kwargs["llm_latency"] = llm_latency
+        for measurement in func(**kwargs):
+            flag = "  OVER BUDGET" if over_budget(measurement) else ""
+            print(f"{measurement['name']:<55} {measurement['value']:>14.2f} {measurement['unit']}{flag}")
+            measurements.append(measurement)
+
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "quick": quick,
+            "llm_latency": llm_latency
+        },
+        "results": {m["name"]: m for m in measurements}
+    }
+
+def compare(report, baseline, tolerance):
+    """
+    Compare a report against a saved baseline
+
+    Args:
+        report (dict): Current benchmark report
+        baseline (dict): Previously saved benchmark report
+        tolerance (float): Allowed relative slowdown before flagging a regression
+
+    Returns:
+        list: Names of the regressed measurements
+    """
+    regressions = []
+    print(f"\n{'benchmark':<55} {'baseline':>12} {'current':>12} {'change':>8}")
+    for name, base in baseline.get("results", {}).items():
+        current = report["results"].get(name)
+        if current is None or not base["value"]:
+            continue
+        change = (current["value"] - base["value"]) / base["value"]
+        if base["higher_is_better"]:
+            regressed = change < -tolerance
+        else:
+            regressed = change > tolerance
+        flag = "  REGRESSION" if regressed else ""
+        print(f"{name:<55} {base['value']:>12.2f} {current['value']:>12.2f} {change:>+8.1%}{flag}")
+        if regressed:
+            regressions.append(name)
+    return regressions
+
+def main():
+    """Main entry point"""
+    parser = argparse.ArgumentParser(description="AI Game Creator benchmarks")
+    parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS), help="Benchmarks to run")
+    parser.add_argument("--quick", action="store_true", help="Use fewer iterations")
+    parser.add_argument("--llm-latency", type=float, default=0.0,
+                        help="Simulated LLM round trip in seconds")
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    parser.add_argument("--baseline", help="Compare against a saved JSON results file")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="Allowed relative slowdown against the baseline (default 0.2)")
+
+    args = parser.parse_args()
+
+    report = run(args.only, args.quick, args.llm_latency)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+    failed = False
+    over = [m["name"] for m in report["results"].values() if over_budget(m)]
+    if over:
+        print(f"\n{len(over)} measurement(s) over budget: {', '.join(over)}")
+        failed = True
+
+    if args.baseline:
+        with open(args.baseline, "r") as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) beyond {args.tolerance:.0%}")
+            failed = True
+        else:
+            print("\nNo regressions")
+
+    if failed:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
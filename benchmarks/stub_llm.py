@@ -0,0 +1,60 @@
+"""
+Offline stand-in for the OpenAI client used by the benchmarks
+"""
+import json
+import time
+
+DEFAULT_RESPONSE = {
+    "game_type": "platformer",
+    "player_character": "A frog",
+    "environment": "A swamp",
+    "goal": "Collect flies and avoid alligators",
+    "obstacles": ["alligators"],
+    "mechanics": ["jumping"]
+}
+
+class _Message:
+    def __init__(self, content):
+        self.content = content
+
+class _Choice:
+    def __init__(self, content):
+        self.message = _Message(content)
+
+class _Response:
+    def __init__(self, content):
+        self.choices = [_Choice(content)]
+
+class _Completions:
+    def __init__(self, owner):
+        self._owner = owner
+
+    def create(self, model, messages, **kwargs):
+        """Return the canned response, optionally after a simulated delay"""
+        self._owner.calls += 1
+        if self._owner.latency:
+            time.sleep(self._owner.latency)
+        return _Response(self._owner.content)
+
+class _Chat:
+    def __init__(self, owner):
+        self.completions = _Completions(owner)
+
+class StubLLMClient:
+    """
+    Mimics the subset of the OpenAI client used by GameDescriptionParser
+    (client.chat.completions.create) without touching the network.
+    """
+
+    def __init__(self, response=None, latency=0.0):
+        """
+        Initialize the stub
+
+        Args:
+            response (dict): Game parameters to return for every request
+            latency (float): Seconds to sleep per request to simulate the API
+        """
+        self.content = json.dumps(response if response is not None else DEFAULT_RESPONSE)
+        self.latency = latency
+        self.calls = 0
+        self.chat = _Chat(self)
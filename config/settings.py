@@ -1,15 +1,11 @@
 """
 Configuration settings for the AI Game Creator
+
+The API keys and the other settings taken from the environment are read
+lazily: the .env file is loaded and they are looked up on first access, so
+importing the settings stays cheap for the modes that never need them.
 """
 import os
-from dotenv import load_dotenv
-
-# Load environment variables from .env file
-load_dotenv()
-
-# API keys
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY")
 
 # Game settings
 DEFAULT_GAME_WIDTH = 800
@@ -23,7 +19,54 @@ TEMPLATES_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)),
 # Asset settings
 ASSETS_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "assets")
 
-# Check if API key is set
-if not OPENAI_API_KEY:
-    print("Warning: OPENAI_API_KEY not found in environment variables.")
-    print("Please add it to your .env file or export it directly.")
\ No newline at end of file
+# Browser streaming settings. Sessions are threads of the web server
+# process, so together they get at most one core (they share the GIL; see
+# the TODO in app/web/streaming.py); the stream benchmark reports how many
+# sessions one core serves at 30 fps, about 11 on a typical machine.
+STREAM_MAX_SESSIONS = 10      # Concurrent games streamed by one server
+STREAM_MAX_FPS = 30           # Frame rate sent to the browser at best
+STREAM_MIN_FPS = 5            # Frame rate the adaptation never drops below
+STREAM_CPU_BUDGET = 1.0 / STREAM_MAX_SESSIONS  # Share of the core each session may use
+STREAM_IDLE_TIMEOUT = 60      # Seconds before an unwatched session ends
+
+# Job distribution settings (BROKER_URL, where games are queued for
+# workers, comes from the environment, see ENV_DEFAULTS)
+WORKER_CAPACITY = 4           # Games a worker node runs at once
+WORKER_HEARTBEAT_INTERVAL = 5 # Seconds between worker heartbeats
+WORKER_TIMEOUT = 15           # Seconds without a heartbeat before a node is dropped
+JOB_RESULT_TTL = 3600         # Seconds a job's status is kept
+
+# API keys, resolved on first access by __getattr__
+API_KEY_NAMES = ("OPENAI_API_KEY", "ANTHROPIC_API_KEY")
+
+# Other settings read from the environment or .env on first access, and
+# their defaults
+ENV_DEFAULTS = {
+    "BROKER_URL": "memory://"
+}
+
+_env_loaded = False
+
+def load_environment():
+    """Load environment variables from the .env file (once)"""
+    global _env_loaded
+    if not _env_loaded:
+        from dotenv import load_dotenv
+        load_dotenv()
+        _env_loaded = True
+
+def __getattr__(name):
+    """Resolve the API key and environment settings on first use"""
+    if name not in API_KEY_NAMES and name not in ENV_DEFAULTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    
+    load_environment()
+    value = os.getenv(name, ENV_DEFAULTS.get(name))
+    
+    # Check if API key is set
+    if name == "OPENAI_API_KEY" and not value:
+        print("Warning: OPENAI_API_KEY not found in environment variables.")
+        print("Please add it to your .env file or export it directly.")
+    
+    globals()[name] = value
+    return value
@@ -0,0 +1,26 @@
+"""
+Test suite for the AI Game Creator
+
+Runs offline and headless, like the benchmarks:
+    python -m unittest discover tests
+"""
+import os
+import sys
+
+# Run without a display, sound card or API key
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+os.environ.setdefault("OPENAI_API_KEY", "offline-test")
+
+# Add the project root to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+GAME_PARAMS = {
+    "game_type": "platformer",
+    "player_character": "A frog",
+    "environment": "A swamp",
+    "goal": "Collect flies and avoid alligators",
+    "obstacles": ["alligators", "snakes", "herons"],
+    "mechanics": ["jumping"]
+}
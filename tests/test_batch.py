@@ -0,0 +1,38 @@
+"""
+Tests for batch level validation
+"""
+import random
+import unittest
+
+from tests import GAME_PARAMS
+from app.batch import validate_level
+from app.game_engine.engine import GameObject
+from app.game_engine.templates.platformer import create_game_objects
+
+class Broken(GameObject):
+    """Object whose update always fails"""
+    __slots__ = ()
+
+    def update(self, dt=1):
+        raise RuntimeError("broken update")
+
+class ValidateLevelTest(unittest.TestCase):
+
+    def level(self):
+        random.seed(0)
+        return create_game_objects(GAME_PARAMS, "")
+
+    def test_simulates_at_every_timestep(self):
+        for timestep in (1, 4, 8):
+            with self.subTest(timestep=timestep):
+                report = validate_level(self.level(), 300, timestep)
+                self.assertTrue(report["valid"], report)
+                self.assertIsNone(report["error"])
+
+    def test_reports_why_the_simulation_failed(self):
+        report = validate_level(self.level() + [Broken(10, 10, 10, 10)], 300, 4)
+        self.assertFalse(report["checks"]["simulation_ran"])
+        self.assertEqual(report["error"], "RuntimeError: broken update")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+"""
+Tests for the job brokers
+"""
+import time
+import unittest
+
+from tests import GAME_PARAMS
+from app.broker import InProcessBroker, RedisBroker, LocalRedis
+
+# Seconds without a heartbeat before a node is dropped, kept short for the tests
+NODE_TIMEOUT = 0.2
+
+class BrokerTests:
+    """Routing and failover checks shared by every broker"""
+
+    def create_broker(self):
+        """Return a fresh broker created with NODE_TIMEOUT"""
+        raise NotImplementedError
+
+    def setUp(self):
+        self.broker = self.create_broker()
+        for node_id in ("a", "b"):
+            self.broker.heartbeat(node_id, capacity=1, running=0)
+
+    def submit(self):
+        return self.broker.submit("platformer", GAME_PARAMS)
+
+    def test_routes_on_running_jobs(self):
+        # "a" starts a job but its heartbeat still says it runs nothing
+        first = self.submit()
+        self.assertEqual(self.broker.fetch(first["node"], timeout=1.0)["id"], first["id"])
+        second = self.submit()
+        self.assertNotEqual(second["node"], first["node"])
+
+    def test_requeues_jobs_of_a_silent_node(self):
+        broker = self.broker
+        first = self.submit()
+        broker.fetch(first["node"], timeout=1.0)
+        second = self.submit()
+
+        # The second node runs a job and has another queued, then goes silent
+        broker.fetch(second["node"], timeout=1.0)
+        third = self.submit()
+        fourth = self.submit()
+        lost = second["node"]
+        survivor = first["node"]
+        queued_on_lost = [job for job in (third, fourth) if job["node"] == lost]
+        self.assertEqual(len(queued_on_lost), 1, "queued jobs not spread over the nodes")
+
+        time.sleep(NODE_TIMEOUT * 1.5)
+        broker.heartbeat(survivor, capacity=1, running=1)
+        self.assertEqual([node["node"] for node in broker.nodes()], [survivor])
+        self.assertEqual(broker.status(second["id"])["status"], "failed")
+        requeued = broker.status(queued_on_lost[0]["id"])
+        self.assertEqual((requeued["status"], requeued["node"]), ("queued", None))
+
+        # The surviving node picks up its own job, then the requeued one
+        fetched = [broker.fetch(survivor, timeout=1.0)["id"] for _ in range(2)]
+        self.assertIn(queued_on_lost[0]["id"], fetched)
+        for job_id in fetched:
+            broker.report(job_id, "finished", returncode=0)
+            self.assertEqual(broker.status(job_id)["node"], survivor)
+
+class InProcessBrokerTest(BrokerTests, unittest.TestCase):
+
+    def create_broker(self):
+        return InProcessBroker(node_timeout=NODE_TIMEOUT)
+
+class RedisBrokerTest(BrokerTests, unittest.TestCase):
+
+    def create_broker(self):
+        return RedisBroker(LocalRedis(), node_timeout=NODE_TIMEOUT)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,141 @@
+"""
+Tests for platform collisions in the platformer
+"""
+import random
+import unittest
+
+from tests import GAME_PARAMS
+from app.game_engine.engine import GameObject, Player
+from app.game_engine.templates.platformer import (Platform, Enemy, PlatformerGame,
+                                                  create_game_objects)
+
+# Environments that select each of the platformer's built-in layouts
+LAYOUTS = ("A swamp", "A mountain", "A cave")
+
+def landing(platforms, start, x, direction, hold, dt=1):
+    """
+    Jump from a platform and return where the player lands
+
+    Args:
+        platforms (list): Level platforms
+        start (Platform): Platform the player stands on
+        x (float): Player position on it
+        direction (int): -1, 0 or 1, held for the first hold frames of the jump
+        hold (int): Frames the direction is held
+        dt (int): Frames per update
+
+    Returns:
+        Platform: Platform the player ends up standing on, or None
+    """
+    player = Player(x, start.y - 50, 50, 50)
+    game = PlatformerGame(player, platforms, [], [], GameObject(-1000, -1000, 1, 1))
+    game.update(dt)
+    player.jump()
+    for frame in range(0, 200, dt):
+        player.velocity_x = direction * player.speed if frame < hold else 0
+        game.update(dt)
+        if player.on_ground:
+            break
+    for platform in platforms:
+        if (player.on_ground and player.y + player.height == platform.y and
+                player.x + player.width > platform.x and player.x < platform.x + platform.width):
+            return platform
+    return None
+
+def unreachable(platforms, dt=1):
+    """Platforms the player can't jump onto, starting from the ground"""
+    reached = [platforms[0]]
+    frontier = [platforms[0]]
+    while frontier:
+        found = []
+        for platform in frontier:
+            for x in range(int(platform.x) - 49, int(platform.x + platform.width), 20):
+                for direction in (-1, 0, 1):
+                    for hold in range(0, 45, 5):
+                        target = landing(platforms, platform, x, direction, hold, dt)
+                        if target is not None and not any(target is p for p in reached + found):
+                            found.append(target)
+        reached += found
+        frontier = found
+    return [(p.x, p.y) for p in platforms if not any(p is r for r in reached)]
+
+class StockLayoutsClimbableTest(unittest.TestCase):
+    """Every platform of the built-in layouts can be reached by jumping"""
+
+    def test_layouts_are_climbable(self):
+        for environment in LAYOUTS:
+            game_objects = create_game_objects(dict(GAME_PARAMS, environment=environment), "")
+            game = next(obj for obj in game_objects if hasattr(obj, "platforms"))
+            for dt in (1, 4):
+                with self.subTest(environment=environment, dt=dt):
+                    self.assertEqual(unreachable(game.platforms, dt), [])
+
+class TimestepConsistencyTest(unittest.TestCase):
+    """One update of dt frames matches dt updates of one frame"""
+
+    TIMESTEPS = (2, 4, 8)
+
+    def assertSameSteps(self, what, dt, expected, actual):
+        """Compare the state after dt short updates with that after one long one"""
+        self.assertEqual(len(expected), len(actual))
+        for e, a in zip(expected, actual):
+            self.assertAlmostEqual(e, a, delta=1e-9,
+                                   msg=f"{what}: one update with dt={dt} gave {actual}, "
+                                       f"{dt} updates with dt=1 gave {expected}")
+
+    def test_player_in_free_flight(self):
+        rng = random.Random(0)
+        for dt in self.TIMESTEPS:
+            for _ in range(200):
+                start = (rng.uniform(0, 750), rng.uniform(0, 300), rng.choice((-5, 0, 5)),
+                         rng.uniform(-10, 5))
+                players = []
+                for _ in range(2):
+                    player = Player(start[0], start[1], 50, 50)
+                    player.velocity_x, player.velocity_y = start[2], start[3]
+                    players.append(player)
+                for _ in range(dt):
+                    players[0].update()
+                players[1].update(dt)
+                self.assertSameSteps("Player.update", dt,
+                                     *[(p.x, p.y, p.velocity_y, p.on_ground) for p in players])
+
+    def test_enemy_patrol(self):
+        rng = random.Random(0)
+        for dt in self.TIMESTEPS:
+            for _ in range(200):
+                patrol, offset, direction = rng.randint(10, 150), rng.uniform(0, 10), rng.choice((-1, 1))
+                enemies = [Enemy(300, 500, 40, 40, patrol) for _ in range(2)]
+                for enemy in enemies:
+                    enemy.x += offset
+                    enemy.direction = direction
+                for _ in range(dt):
+                    enemies[0].update()
+                enemies[1].update(dt)
+                self.assertSameSteps("Enemy.update", dt, *[(e.x, e.direction) for e in enemies])
+
+    def test_jump_through_one_way_platform(self):
+        # Jump from the ground up through a one-way platform that the top of
+        # the jump only just reaches (the feet stop 9 px into it), and land
+        # on it on the way down; with dt=8 this needs the fall to be swept
+        # from the top of the jump rather than from the start of the tick
+        for dt in self.TIMESTEPS:
+            games = []
+            for _ in range(2):
+                platforms = [Platform(0, 550, 800, 50), Platform(50, 446, 200, 20)]
+                games.append(PlatformerGame(Player(100, 500, 50, 50), platforms, [], [],
+                                            GameObject(700, 0, 50, 50)))
+            for frame in range(0, 120, dt):
+                for game in games:
+                    if game.player.on_ground and frame % 40 == 0:
+                        game.player.jump()
+                for _ in range(dt):
+                    games[0].update()
+                games[1].update(dt)
+                self.assertSameSteps("PlatformerGame.update", dt,
+                                     *[(g.player.y, g.player.velocity_y, g.player.on_ground)
+                                       for g in games])
+            self.assertEqual(games[1].player.y, 446 - 50, f"did not land on the platform with dt={dt}")
+
+if __name__ == "__main__":
+    unittest.main()
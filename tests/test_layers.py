@@ -0,0 +1,76 @@
+"""
+Tests for layered frame composition
+"""
+import unittest
+
+import pygame
+from app.game_engine.engine import GameObject
+from app.game_engine.layers import Layer, Compositor, View, STATIC, DYNAMIC, MAX_TILES
+
+WIDTH, HEIGHT = 800, 600
+BACKGROUND = (0, 0, 0)
+MAGENTA = (255, 0, 255)
+CYAN = (0, 255, 255)
+
+class CompositorTest(unittest.TestCase):
+    """Scrolled layers show the right part of the world at a fixed cost in memory"""
+
+    def setUp(self):
+        self.screen = pygame.Surface((WIDTH, HEIGHT))
+
+    def color_at(self, x, y):
+        return tuple(self.screen.get_at((x, y)))[:3]
+
+    def test_static_layer_scrolls_past_the_first_screen(self):
+        marker = GameObject(WIDTH + 100, 20, 40, 10, MAGENTA)
+        # Straddles the edge between the first two tiles
+        straddling = GameObject(WIDTH - 20, 200, 40, 10, CYAN)
+        compositor = Compositor([Layer("level", STATIC, [marker, straddling], background=BACKGROUND)])
+
+        compositor.render(self.screen, (WIDTH // 2, 0))
+        self.assertEqual(self.color_at(marker.x - WIDTH // 2, marker.y), MAGENTA)
+        self.assertEqual(self.color_at(straddling.x - WIDTH // 2, 205), CYAN)
+        self.assertEqual(self.color_at(straddling.x - WIDTH // 2 + 39, 205), CYAN)
+        self.assertEqual(self.color_at(straddling.x - WIDTH // 2 + 40, 205), BACKGROUND)
+
+    def test_dynamic_layer_scrolls_with_parallax(self):
+        actor = GameObject(1500, 300, 20, 20, MAGENTA)
+        compositor = Compositor([Layer("actors", DYNAMIC, [actor], parallax=(0.5, 1.0))])
+
+        compositor.render(self.screen, (2000, 100))
+        self.assertEqual(self.color_at(500, 200), MAGENTA)
+        self.assertEqual(self.color_at(499, 200), BACKGROUND)
+
+    def test_memory_does_not_grow_with_the_camera(self):
+        objects = [GameObject(x, 500, 40, 10, CYAN) for x in range(0, 21000, 100)]
+        static = Layer("level", STATIC, objects, background=BACKGROUND)
+        dynamic = Layer("actors", DYNAMIC, objects)
+        compositor = Compositor([static, dynamic])
+
+        for x in range(0, 20000, 370):
+            compositor.render(self.screen, (x, x % 700 - 350))
+            self.assertLessEqual(len(static.tiles), MAX_TILES)
+            for tile in static.tiles.values():
+                self.assertEqual(tile.get_size(), (WIDTH, HEIGHT))
+            self.assertEqual(dynamic.surface.get_size(), (WIDTH, HEIGHT))
+        # The last camera position is (19980, 30)
+        self.assertEqual(self.color_at(20000 - 19980, 500 - 30), CYAN)
+
+    def test_invalidate_rebakes_static_layer(self):
+        platform = GameObject(100, 100, 40, 10, MAGENTA)
+        compositor = Compositor([Layer("level", STATIC, [platform], background=BACKGROUND)])
+        compositor.render(self.screen)
+        platform.color = CYAN
+        compositor.render(self.screen)
+        self.assertEqual(self.color_at(100, 100), MAGENTA)
+        compositor.invalidate("level")
+        compositor.render(self.screen)
+        self.assertEqual(self.color_at(100, 100), CYAN)
+
+    def test_objects_draw_in_view_coordinates(self):
+        view = View((100, 100), origin=(1000, 2000))
+        GameObject(1010, 2020, 5, 5, MAGENTA).draw(view)
+        self.assertEqual(tuple(view.get_at((10, 20)))[:3], MAGENTA)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,51 @@
+"""
+Tests for the base game objects
+"""
+import copy
+import unittest
+
+import pygame
+from app.game_engine.engine import GameObject
+
+class ObjectRectTest(unittest.TestCase):
+    """A game object's rect writes in-place changes back, and rects made from it don't"""
+
+    def setUp(self):
+        self.obj = GameObject(10.5, 20.5, 30, 40)
+
+    def position(self):
+        obj = self.obj
+        return (obj.x, obj.y, obj.width, obj.height)
+
+    def test_in_place_changes_reach_the_object(self):
+        self.obj.rect.x += 5
+        self.obj.rect.move_ip(0, 3)
+        self.obj.rect.width = 12
+        self.assertEqual(self.position(), (15, 23, 12, 40))
+
+    def test_unchanged_values_keep_their_fraction(self):
+        self.obj.rect.width = 12
+        self.assertEqual(self.position(), (10.5, 20.5, 12, 40))
+
+    def test_derived_rects_are_independent(self):
+        rect = self.obj.rect
+        derived = [rect.copy(), rect.move(1, 1), rect.inflate(2, 2), rect.clip((0, 0, 100, 100)),
+                   rect.union((0, 0, 1, 1)), rect.fit((0, 0, 5, 5)), rect.clamp((0, 0, 5, 5)),
+                   rect.scale_by(2), copy.copy(rect), copy.deepcopy(rect)]
+        for other in derived:
+            with self.subTest(other=other):
+                other.x = 3
+                other.bottom = 7
+                other.move_ip(1, 1)
+                other.update(1, 2, 3, 4)
+                self.assertEqual(self.position(), (10.5, 20.5, 30, 40))
+
+    def test_modified_copy_can_be_assigned_back(self):
+        rect = self.obj.rect.copy()
+        rect.bottom = 100
+        self.obj.rect = rect
+        self.assertEqual(self.position(), (10, 60, 30, 40))
+        self.assertEqual(self.obj.rect, pygame.Rect(10, 60, 30, 40))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+"""
+Tests for the binary snapshot format
+"""
+import json
+import random
+import unittest
+
+from tests import GAME_PARAMS
+from app.game_engine.engine import GameObject
+from app.game_engine.snapshot import pack_snapshot, LevelSnapshot, HEADER, _align
+from app.game_engine.templates.platformer import create_game_objects, Platform
+
+def describe(game_objects):
+    """Comparable summary of game objects and the entities their managers reference"""
+    summary = []
+    for obj in game_objects:
+        if isinstance(obj, GameObject):
+            summary.append((type(obj).__name__, obj.x, obj.y, obj.width, obj.height,
+                            tuple(obj.color), *[getattr(obj, f) for f in obj.snapshot_fields]))
+        else:
+            summary.append((type(obj).__name__, obj.score, obj.level_complete,
+                            [game_objects.index(p) for p in obj.platforms],
+                            [game_objects.index(e) for e in obj.enemies],
+                            game_objects.index(obj.player)))
+    return summary
+
+def tamper(data, change):
+    """Return snapshot bytes with their metadata passed through change()"""
+    magic, version, types, count, length, tick = HEADER.unpack_from(data)
+    start = _align(HEADER.size)
+    metadata = json.loads(bytes(data[start:start + length]))
+    change(metadata)
+    encoded = json.dumps(metadata).encode("utf-8")
+    header = HEADER.pack(magic, version, types, count, len(encoded), tick)
+    return (header + bytes(start - len(header)) + encoded +
+            bytes(_align(len(encoded)) - len(encoded)) + data[start + _align(length):])
+
+class SnapshotTest(unittest.TestCase):
+
+    def level(self):
+        random.seed(0)
+        return create_game_objects(GAME_PARAMS, "")
+
+    def load(self, data):
+        return LevelSnapshot(data).build_game_objects()
+
+    def test_round_trip(self):
+        game_objects = self.level()
+        game_objects[0].on_ground = True
+        restored = self.load(pack_snapshot(game_objects, "platformer", GAME_PARAMS, tick=7))
+        self.assertEqual(describe(restored), describe(game_objects))
+        snapshot = LevelSnapshot(pack_snapshot(game_objects, "platformer", GAME_PARAMS, tick=7))
+        self.assertEqual((snapshot.template_name, snapshot.game_params, snapshot.tick),
+                         ("platformer", GAME_PARAMS, 7))
+        self.assertIs(restored[0].on_ground, True)
+
+    def test_types_only_store_their_own_fields(self):
+        game_objects = self.level()
+        base = len(pack_snapshot(game_objects))
+        platforms = [Platform(i, i, 10, 10) for i in range(1000)]
+        # 35 bytes of color and geometry each, plus a little metadata and padding
+        self.assertLessEqual(len(pack_snapshot(game_objects + platforms)) - base, 1000 * 36)
+
+    def test_rejects_types_outside_the_app_package(self):
+        data = tamper(pack_snapshot(self.level()),
+                      lambda metadata: metadata["types"][0].update(type="os:system"))
+        with self.assertRaisesRegex(ValueError, "Untrusted type"):
+            self.load(data)
+
+    def test_rejects_entities_that_are_not_game_objects(self):
+        data = tamper(pack_snapshot(self.level()), lambda metadata: metadata["types"][0].update(
+            type="app.game_engine.templates.platformer:PlatformerGame"))
+        with self.assertRaisesRegex(ValueError, "Untrusted type"):
+            self.load(data)
+
+    def test_rejects_unknown_fields(self):
+        def add_field(metadata):
+            metadata["types"][0]["fields"][0] = "__class__"
+        data = tamper(pack_snapshot(self.level()), add_field)
+        with self.assertRaisesRegex(ValueError, "Unknown fields"):
+            self.load(data)
+
+    def test_rejects_truncated_data(self):
+        data = pack_snapshot(self.level())
+        with self.assertRaisesRegex(ValueError, "truncated"):
+            LevelSnapshot(data[:-16])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+"""
+Tests for the vectorized platformer environment
+"""
+import io
+import random
+import unittest
+import contextlib
+
+from tests import GAME_PARAMS
+import pygame
+from app.game_engine.engine import GameEngine
+from app.game_engine.vector_env import (VectorPlatformerEnv, NUM_ACTIONS, _ACTION_MOVES,
+                                        IDLE, JUMP)
+
+class VectorEnvParityTest(unittest.TestCase):
+    """VectorPlatformerEnv plays a level exactly like GameEngine.step()"""
+
+    def play(self, seed, actions, spawn=None):
+        """
+        Play the same level and actions in both and compare every tick
+
+        Args:
+            seed (int): Random seed the level is built with
+            actions (list): Action of each tick
+            spawn (tuple): Player start position, the level's when omitted
+
+        Returns:
+            GameEngine: The engine, after the actions
+        """
+        engine = GameEngine(headless=True)
+        random.seed(seed)
+        with contextlib.redirect_stdout(io.StringIO()):
+            engine.create_game("platformer", GAME_PARAMS)
+        game = next(obj for obj in engine.game_objects if hasattr(obj, "managed_objects"))
+        if spawn is not None:
+            game.player.x, game.player.y = spawn
+        env = VectorPlatformerEnv([engine.game_objects], max_steps=len(actions) + 1, autoreset=False)
+
+        for tick, action in enumerate(actions):
+            direction, jump = _ACTION_MOVES[action]
+            keys = {-1: (pygame.K_LEFT,), 0: (), 1: (pygame.K_RIGHT,)}[direction]
+            events = [pygame.event.Event(pygame.KEYDOWN, key=pygame.K_SPACE)] if jump else []
+            engine.step(keys=keys, events=events, render=False)
+            _, _, dones, _ = env.step([action])
+
+            player = game.player
+            expected = (player.x, player.y, player.velocity_x, player.velocity_y, player.on_ground,
+                        game.score, [enemy.x for enemy in game.enemies])
+            actual = (env.player_x[0], env.player_y[0], env.velocity_x[0], env.velocity_y[0],
+                      env.on_ground[0], env.score[0], env.enemy_x)
+            self.assertEqual(expected, actual, f"diverged at tick {tick} (seed {seed})")
+            if dones[0]:
+                break
+        return engine
+
+    def test_matches_engine_step(self):
+        for seed in range(10):
+            rng = random.Random(seed)
+            with self.subTest(seed=seed):
+                self.play(seed, [rng.randrange(NUM_ACTIONS) for _ in range(500)])
+
+    def test_matches_engine_step_up(self):
+        # Stand under the first raised platform and jump onto it; the top of
+        # the jump is just short of the platform's top
+        engine = self.play(0, [IDLE, JUMP] + [IDLE] * 60, spawn=(200, 500))
+        game = next(obj for obj in engine.game_objects if hasattr(obj, "managed_objects"))
+        self.assertEqual(game.player.y, game.platforms[1].y - game.player.height)
+
+if __name__ == "__main__":
+    unittest.main()